@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from vsuet_accounting.application import services
+from vsuet_accounting.application.cache import clear_caches
+from vsuet_accounting.config import get_settings
+from vsuet_accounting.infrastructure.db.generate import (
+    GeneratorParams,
+    generate_dataset,
+)
+from vsuet_accounting.infrastructure.db.init_db import database_is_empty, init_db
+from vsuet_accounting.infrastructure.db.session import configure_database
+
+DATASETS = {
+    "10k": GeneratorParams(
+        departments=5, employees=50, vendors=20, years=1, expenses_per_month=700
+    ),
+    "1m": GeneratorParams(
+        departments=20,
+        employees=2_000,
+        vendors=300,
+        years=5,
+        expenses_per_month=15_000,
+    ),
+    "10m": GeneratorParams(
+        departments=60,
+        employees=10_000,
+        vendors=1_500,
+        years=10,
+        expenses_per_month=75_000,
+    ),
+}
+
+ORM_LIST_LIMIT = 1_000_000
+DEFAULT_ITERATIONS = 5
+DEFAULT_THRESHOLD = 0.25
+MIN_REGRESSION_MS = 5.0
+
+Case = Callable[[Session], Any]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    run: Case
+    max_rows: Optional[int] = None
+    writes: bool = False
+
+
+def _count(result: Any) -> int:
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], list):
+        return len(result[0])
+    if isinstance(result, dict):
+        return 1
+    if hasattr(result, "__len__"):
+        return len(result)
+    return sum(len(chunk) for chunk in result)
+
+
+def _period(params: GeneratorParams) -> tuple[date, date]:
+    return date(params.end_date.year, 1, 1), params.end_date
+
+
+def expense_report_cases(params: GeneratorParams) -> list[Benchmark]:
+    date_from, date_to = _period(params)
+    cases = []
+    flags = itertools.product((False, True), repeat=4)
+    for department, vendor, period, approved in flags:
+        filters = {
+            "department_id": 1 if department else None,
+            "vendor_id": 1 if vendor else None,
+            "date_from": date_from if period else None,
+            "date_to": date_to if period else None,
+            "approved_only": approved,
+        }
+        label = ",".join(
+            name
+            for name, enabled in (
+                ("department", department),
+                ("vendor", vendor),
+                ("period", period),
+                ("approved", approved),
+            )
+            if enabled
+        )
+        cases.append(
+            Benchmark(
+                f"expenses_report[{label or 'all'}]",
+                lambda session, filters=filters: services.expenses_report(
+                    session, **filters
+                ),
+            )
+        )
+    return cases
+
+
+def service_cases(params: GeneratorParams) -> list[Benchmark]:
+    date_from, date_to = _period(params)
+    deep_cursor = services.encode_cursor(date_from, 0)
+    archive_cutoff = date(params.start_date.year + 1, 1, 1)
+    return [
+        *expense_report_cases(params),
+        Benchmark(
+            "iter_expenses_report[period]",
+            lambda session: services.iter_expenses_report(
+                session, date_from=date_from, date_to=date_to
+            ),
+        ),
+        Benchmark(
+            "iter_payrolls_report[period]",
+            lambda session: services.iter_payrolls_report(
+                session, date_from=date_from, date_to=date_to
+            ),
+        ),
+        Benchmark("expenses_report_frame[all]", services.expenses_report_frame),
+        Benchmark(
+            "expenses_report_frame[period]",
+            lambda session: services.expenses_report_frame(
+                session, date_from=date_from, date_to=date_to
+            ),
+        ),
+        Benchmark("payrolls_report_frame[all]", services.payrolls_report_frame),
+        Benchmark(
+            "payrolls_report_frame[archived]",
+            lambda session: services.payrolls_report_frame(
+                session, include_archived=True
+            ),
+        ),
+        Benchmark("expenses_summary_frame[all]", services.expenses_summary_frame),
+        Benchmark(
+            "expenses_summary_frame[period]",
+            lambda session: services.expenses_summary_frame(
+                session, date_from, date_to
+            ),
+        ),
+        Benchmark("payrolls_summary_frame[all]", services.payrolls_summary_frame),
+        Benchmark(
+            "payrolls_summary_frame[period]",
+            lambda session: services.payrolls_summary_frame(
+                session, date_from, date_to
+            ),
+        ),
+        Benchmark("expenses_summary[all]", services.expenses_summary),
+        Benchmark(
+            "expenses_summary[period]",
+            lambda session: services.expenses_summary(session, date_from, date_to),
+        ),
+        Benchmark(
+            "expenses_summary[period,no_rollup]",
+            lambda session: services.expenses_summary(
+                session, date_from, date_to, use_rollup=False
+            ),
+        ),
+        Benchmark("payrolls_summary[all]", services.payrolls_summary),
+        Benchmark(
+            "payrolls_summary[period]",
+            lambda session: services.payrolls_summary(session, date_from, date_to),
+        ),
+        Benchmark(
+            "payrolls_summary[period,no_rollup]",
+            lambda session: services.payrolls_summary(
+                session, date_from, date_to, use_rollup=False
+            ),
+        ),
+        Benchmark("payrolls_report[all]", services.payrolls_report),
+        Benchmark(
+            "payrolls_report[archived]",
+            lambda session: services.payrolls_report(session, include_archived=True),
+        ),
+        Benchmark(
+            "payrolls_report[employee]",
+            lambda session: services.payrolls_report(session, employee_id=1),
+        ),
+        Benchmark(
+            "payrolls_report[employee,archived]",
+            lambda session: services.payrolls_report(
+                session, employee_id=1, include_archived=True
+            ),
+        ),
+        Benchmark("dashboard_counts", services.dashboard_counts),
+        Benchmark(
+            "dashboard_counts[estimated]",
+            lambda session: services.dashboard_counts(session, estimated=True),
+        ),
+        Benchmark("list_departments", services.list_departments),
+        Benchmark("list_employees", services.list_employees),
+        Benchmark("list_vendors", services.list_vendors),
+        Benchmark("department_options", services.department_options),
+        Benchmark("employee_options", services.employee_options),
+        Benchmark("vendor_options", services.vendor_options),
+        Benchmark("list_departments_rows", services.list_departments_rows),
+        Benchmark("list_employees_rows", services.list_employees_rows),
+        Benchmark("list_vendors_rows", services.list_vendors_rows),
+        Benchmark("list_expenses_rows[first]", services.list_expenses_rows),
+        Benchmark(
+            "list_expenses_rows[deep]",
+            lambda session: services.list_expenses_rows(session, deep_cursor),
+        ),
+        Benchmark("list_payrolls_rows[first]", services.list_payrolls_rows),
+        Benchmark(
+            "list_payrolls_rows[deep]",
+            lambda session: services.list_payrolls_rows(session, deep_cursor),
+        ),
+        Benchmark("list_expenses_page[first]", services.list_expenses_page),
+        Benchmark("list_payrolls_page[first]", services.list_payrolls_page),
+        Benchmark("list_expenses", services.list_expenses, max_rows=ORM_LIST_LIMIT),
+        Benchmark("list_payrolls", services.list_payrolls, max_rows=ORM_LIST_LIMIT),
+        Benchmark(
+            "archive_preview[oldest year]",
+            lambda session: services.archive_preview(session, archive_cutoff),
+        ),
+        Benchmark("list_partitions", services.list_partitions),
+        Benchmark(
+            "run_archive[oldest year]",
+            lambda session: services.run_archive(session, archive_cutoff),
+            writes=True,
+        ),
+    ]
+
+
+def _peak_rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_peak_rss() -> None:
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _call(engine, benchmark: Benchmark) -> tuple[float, int]:
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            started = time.perf_counter()
+            result = benchmark.run(session)
+            rows = _count(result)
+            elapsed = time.perf_counter() - started
+        finally:
+            session.close()
+            transaction.rollback()
+    return elapsed, rows
+
+
+def run_case(engine, benchmark: Benchmark, iterations: int) -> dict[str, Any]:
+    clear_caches()
+    _call(engine, benchmark)
+    _reset_peak_rss()
+    rss_before = _peak_rss_kb()
+    samples: list[float] = []
+    rows = 0
+    for _ in range(iterations):
+        clear_caches()
+        elapsed, rows = _call(engine, benchmark)
+        samples.append(elapsed * 1000)
+    p50 = statistics.median(samples)
+    return {
+        "iterations": iterations,
+        "rows": rows,
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+        "rows_per_s": round(rows / (p50 / 1000), 1) if p50 and rows else 0.0,
+        "peak_rss_mb": round(_peak_rss_kb() / 1024, 1),
+        "rss_growth_mb": round((_peak_rss_kb() - rss_before) / 1024, 1),
+    }
+
+
+def _database_url(base_url: str, size: str) -> str:
+    url = make_url(base_url)
+    return url.set(database=f"{url.database}_bench_{size}").render_as_string(
+        hide_password=False
+    )
+
+
+def _create_database(base_url: str, url: str) -> None:
+    from sqlalchemy import create_engine
+
+    name = make_url(url).database
+    admin = create_engine(
+        make_url(base_url).set(database="postgres"), isolation_level="AUTOCOMMIT"
+    )
+    try:
+        with admin.connect() as connection:
+            exists = connection.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": name}
+            )
+            if not exists:
+                connection.execute(text(f'CREATE DATABASE "{name}"'))
+    finally:
+        admin.dispose()
+
+
+def _dataset_rows(engine) -> int:
+    with engine.connect() as connection:
+        return int(
+            connection.scalar(
+                text(
+                    "SELECT coalesce(sum(reltuples), 0)::bigint FROM pg_class "
+                    "WHERE relname IN ('expenses', 'payrolls', 'payrolls_archive') "
+                    "AND relkind IN ('r', 'p')"
+                )
+            )
+        )
+
+
+def prepare_dataset(
+    base_url: str, size: str, regenerate: bool
+) -> tuple[Any, int, Optional[dict[str, Any]]]:
+    url = _database_url(base_url, size)
+    _create_database(base_url, url)
+    engine = configure_database(url)
+    init_db(engine, seed=False)
+    loaded = None
+    with Session(engine) as session:
+        if regenerate or database_is_empty(session):
+            loaded = generate_dataset(session, DATASETS[size], truncate=True)
+    return engine, _dataset_rows(engine), loaded
+
+
+def run_size(
+    base_url: str, size: str, iterations: int, regenerate: bool, only: Optional[str]
+) -> dict[str, Any]:
+    engine, dataset_rows, loaded = prepare_dataset(base_url, size, regenerate)
+    params = DATASETS[size]
+    results: dict[str, Any] = {}
+    try:
+        for benchmark in service_cases(params):
+            if only and only not in benchmark.name:
+                continue
+            if benchmark.max_rows and dataset_rows > benchmark.max_rows:
+                results[benchmark.name] = {
+                    "skipped": f"more than {benchmark.max_rows} rows"
+                }
+                continue
+            results[benchmark.name] = run_case(
+                engine, benchmark, 1 if benchmark.writes else iterations
+            )
+            print(f"{size:>4} {benchmark.name}: {results[benchmark.name]['p50_ms']} ms")
+    finally:
+        engine.dispose()
+    return {"dataset_rows": dataset_rows, "generated": loaded, "cases": results}
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    regressions = []
+    for size, data in current["sizes"].items():
+        reference = baseline.get("sizes", {}).get(size, {}).get("cases", {})
+        for name, metrics in data["cases"].items():
+            previous = reference.get(name)
+            if not previous or "skipped" in metrics or "skipped" in previous:
+                continue
+            for key in ("p50_ms", "p95_ms"):
+                limit = max(
+                    previous[key] * (1 + threshold), previous[key] + MIN_REGRESSION_MS
+                )
+                if metrics[key] > limit:
+                    regressions.append(
+                        f"{size} {name}: {key} {metrics[key]:.1f} > {limit:.1f} "
+                        f"(baseline {previous[key]:.1f})"
+                    )
+            if metrics["rss_growth_mb"] > max(
+                previous["rss_growth_mb"] * (1 + threshold),
+                previous["rss_growth_mb"] + 16,
+            ):
+                regressions.append(
+                    f"{size} {name}: RSS growth {metrics['rss_growth_mb']} MB "
+                    f"(baseline {previous['rss_growth_mb']} MB)"
+                )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark services.py read paths against generated datasets."
+    )
+    parser.add_argument(
+        "--database-url",
+        default=get_settings().database_url,
+        help="server to use; one database <name>_bench_<size> is created per size",
+    )
+    parser.add_argument(
+        "--sizes", default="10k,1m", help=f"any of {','.join(DATASETS)}"
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--regenerate", action="store_true")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in DATASETS]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "iterations": args.iterations,
+        "sizes": {
+            size: run_size(
+                args.database_url, size, args.iterations, args.regenerate, args.only
+            )
+            for size in sizes
+        },
+    }
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Results: {args.output}")
+
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -44,21 +44,245 @@ CREATE TABLE IF NOT EXISTS archive_log (
     id SERIAL PRIMARY KEY,
     source_table VARCHAR(50) NOT NULL,
     archived_at TIMESTAMP NOT NULL DEFAULT NOW(),
-    payload JSONB NOT NULL
+    payload JSONB NOT NULL,
+    txid BIGINT DEFAULT (pg_current_xact_id()::text::bigint)
 );
 
-CREATE OR REPLACE FUNCTION archive_payrolls(cutoff_date date)
+CREATE TABLE IF NOT EXISTS payrolls_archive (
+    id INT PRIMARY KEY,
+    employee_id INT NOT NULL,
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,
+    net_amount NUMERIC(12, 2) NOT NULL,
+    paid_at TIMESTAMP,
+    is_paid BOOLEAN NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS schema_fingerprint (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE,
+    fingerprint VARCHAR(64) NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT ck_schema_fingerprint_single_row CHECK (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_employees_department_id ON employees (department_id);
+CREATE INDEX IF NOT EXISTS ix_expenses_expense_date_id ON expenses (expense_date, id);
+CREATE INDEX IF NOT EXISTS ix_expenses_department_id_expense_date
+    ON expenses (department_id, expense_date);
+CREATE INDEX IF NOT EXISTS ix_expenses_vendor_id_expense_date
+    ON expenses (vendor_id, expense_date);
+CREATE INDEX IF NOT EXISTS ix_expenses_unapproved
+    ON expenses (expense_date) INCLUDE (amount) WHERE NOT is_approved;
+CREATE INDEX IF NOT EXISTS ix_payrolls_period_end_id ON payrolls (period_end, id);
+CREATE INDEX IF NOT EXISTS ix_payrolls_employee_id_period_end
+    ON payrolls (employee_id, period_end);
+CREATE INDEX IF NOT EXISTS ix_payrolls_unpaid
+    ON payrolls (period_end) INCLUDE (net_amount) WHERE NOT is_paid;
+CREATE INDEX IF NOT EXISTS ix_archive_log_source_table_id
+    ON archive_log (source_table, id);
+CREATE INDEX IF NOT EXISTS ix_archive_log_txid ON archive_log (txid);
+CREATE INDEX IF NOT EXISTS ix_payrolls_archive_period_end_id
+    ON payrolls_archive (period_end, id);
+CREATE INDEX IF NOT EXISTS ix_payrolls_archive_employee_id_period_end
+    ON payrolls_archive (employee_id, period_end);
+
+INSERT INTO schema_version (version, name)
+VALUES
+    (1, 'report filter and join indexes'),
+    (2, 'typed payrolls_archive table'),
+    (3, 'archive_log inserting transaction id'),
+    (4, 'archive_log txid index')
+ON CONFLICT (version) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS expense_monthly_rollup (
+    department_id INT NOT NULL,
+    vendor_id INT NOT NULL,
+    month DATE NOT NULL,
+    is_approved BOOLEAN NOT NULL,
+    total_amount NUMERIC(16, 2) NOT NULL,
+    row_count BIGINT NOT NULL,
+    PRIMARY KEY (department_id, vendor_id, month, is_approved)
+);
+
+CREATE INDEX IF NOT EXISTS ix_expense_monthly_rollup_month
+    ON expense_monthly_rollup (month);
+
+CREATE TABLE IF NOT EXISTS payroll_monthly_rollup (
+    department_id INT NOT NULL,
+    employee_id INT NOT NULL,
+    month DATE NOT NULL,
+    is_paid BOOLEAN NOT NULL,
+    total_net NUMERIC(16, 2) NOT NULL,
+    row_count BIGINT NOT NULL,
+    PRIMARY KEY (department_id, employee_id, month, is_paid)
+);
+
+CREATE INDEX IF NOT EXISTS ix_payroll_monthly_rollup_employee_month
+    ON payroll_monthly_rollup (employee_id, month);
+CREATE INDEX IF NOT EXISTS ix_payroll_monthly_rollup_month
+    ON payroll_monthly_rollup (month);
+
+-- Range partitioning of expenses/payrolls is optional: init_db converts the
+-- tables when PARTITIONING=month|year and keeps future partitions created.
+CREATE OR REPLACE FUNCTION ensure_range_partitions(
+    parent text,
+    key_column text,
+    step text,
+    from_date date,
+    to_date date,
+    partition_prefix text DEFAULT NULL
+)
 RETURNS integer AS $$
 DECLARE
+    prefix text := coalesce(partition_prefix, parent);
+    default_name text := coalesce(partition_prefix, parent) || '_default';
+    period_start date := date_trunc(step, from_date)::date;
+    period_end date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE period_start <= to_date LOOP
+        period_end := (period_start + ('1 ' || step)::interval)::date;
+        partition_name := prefix || '_p' || to_char(
+            period_start, CASE step WHEN 'year' THEN 'YYYY' ELSE 'YYYY_MM' END
+        );
+
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', partition_name, parent
+            );
+            IF to_regclass(default_name) IS NOT NULL THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    default_name, key_column, period_start, key_column, period_end,
+                    partition_name
+                );
+            END IF;
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                parent, partition_name, period_start, period_end
+            );
+            created := created + 1;
+        END IF;
+
+        period_start := period_end;
+    END LOOP;
+
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION archive_payroll_partition(cutoff_date date)
+RETURNS integer AS $$
+DECLARE
+    partition_name text;
     moved_count integer;
 BEGIN
-    INSERT INTO archive_log (source_table, payload)
-    SELECT 'payrolls', to_jsonb(p) FROM payrolls p
-    WHERE p.period_end < cutoff_date;
+    SELECT c.relname INTO partition_name
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    CROSS JOIN LATERAL substring(
+        pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)'
+    ) AS upper_bound
+    WHERE i.inhparent = 'payrolls'::regclass
+      AND upper_bound IS NOT NULL
+      AND upper_bound::date <= cutoff_date
+    ORDER BY upper_bound::date
+    LIMIT 1;
+
+    IF partition_name IS NULL THEN
+        RETURN NULL;
+    END IF;
 
+    EXECUTE format(
+        'UPDATE payroll_monthly_rollup r '
+        'SET total_net = r.total_net - o.total_net, row_count = r.row_count - o.row_count '
+        'FROM (SELECT employee_id, date_trunc(''month'', period_end)::date AS month, '
+        'is_paid, sum(net_amount) AS total_net, count(*) AS row_count '
+        'FROM %I GROUP BY 1, 2, 3) o '
+        'WHERE r.employee_id = o.employee_id AND r.month = o.month '
+        'AND r.is_paid = o.is_paid',
+        partition_name
+    );
+    EXECUTE format('ALTER TABLE payrolls DETACH PARTITION %I', partition_name);
+    EXECUTE format(
+        'INSERT INTO payrolls_archive '
+        '(id, employee_id, period_start, period_end, net_amount, paid_at, is_paid) '
+        'SELECT id, employee_id, period_start, period_end, net_amount, paid_at, is_paid '
+        'FROM %I',
+        partition_name
+    );
     GET DIAGNOSTICS moved_count = ROW_COUNT;
+    EXECUTE format('DROP TABLE %I', partition_name);
+
+    RETURN moved_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION archive_payrolls(cutoff_date date)
+RETURNS integer AS $$
+DECLARE
+    moved_count integer;
+    partition_count integer;
+BEGIN
+    moved_count := 0;
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'payrolls'::regclass
+    ) THEN
+        LOOP
+            partition_count := archive_payroll_partition(cutoff_date);
+            EXIT WHEN partition_count IS NULL;
+            moved_count := moved_count + partition_count;
+        END LOOP;
+    END IF;
+
+    WITH moved AS (
+        DELETE FROM payrolls WHERE period_end < cutoff_date
+        RETURNING id, employee_id, period_start, period_end, net_amount, paid_at, is_paid
+    )
+    INSERT INTO payrolls_archive
+        (id, employee_id, period_start, period_end, net_amount, paid_at, is_paid)
+    SELECT id, employee_id, period_start, period_end, net_amount, paid_at, is_paid
+    FROM moved;
+
+    GET DIAGNOSTICS partition_count = ROW_COUNT;
+
+    RETURN moved_count + partition_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION archive_payrolls_batch(cutoff_date date, batch_size integer)
+RETURNS integer AS $$
+DECLARE
+    moved_count integer;
+BEGIN
+    WITH batch AS (
+        SELECT id FROM payrolls
+        WHERE period_end < cutoff_date
+        ORDER BY period_end, id
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    ), moved AS (
+        DELETE FROM payrolls p
+        USING batch b
+        WHERE p.id = b.id
+        RETURNING p.id, p.employee_id, p.period_start, p.period_end,
+                  p.net_amount, p.paid_at, p.is_paid
+    )
+    INSERT INTO payrolls_archive
+        (id, employee_id, period_start, period_end, net_amount, paid_at, is_paid)
+    SELECT id, employee_id, period_start, period_end, net_amount, paid_at, is_paid
+    FROM moved;
 
-    DELETE FROM payrolls WHERE period_end < cutoff_date;
+    GET DIAGNOSTICS moved_count = ROW_COUNT;
 
     RETURN moved_count;
 END;
@@ -66,16 +290,15 @@ $$ LANGUAGE plpgsql;
 
 CREATE OR REPLACE VIEW payrolls_archive_view AS
 SELECT
-    (payload->>'id')::int AS id,
-    (payload->>'employee_id')::int AS employee_id,
-    (payload->>'period_start')::date AS period_start,
-    (payload->>'period_end')::date AS period_end,
-    (payload->>'net_amount')::numeric AS net_amount,
-    (payload->>'paid_at')::timestamp AS paid_at,
-    (payload->>'is_paid')::boolean AS is_paid,
-    archived_at AS archived_at
-FROM archive_log
-WHERE source_table = 'payrolls';
+    id,
+    employee_id,
+    period_start,
+    period_end,
+    net_amount::numeric AS net_amount,
+    paid_at,
+    is_paid,
+    archived_at
+FROM payrolls_archive;
 
 CREATE OR REPLACE VIEW payrolls_all AS
 SELECT
@@ -94,8 +317,189 @@ SELECT
     employee_id,
     period_start,
     period_end,
-    net_amount,
+    net_amount::numeric,
     paid_at,
     is_paid,
     archived_at
-FROM payrolls_archive_view;
+FROM payrolls_archive;
+
+CREATE OR REPLACE FUNCTION expense_rollup_apply()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE expense_monthly_rollup r
+        SET total_amount = r.total_amount - o.total_amount,
+            row_count = r.row_count - o.row_count
+        FROM (
+            SELECT department_id, vendor_id,
+                   date_trunc('month', expense_date)::date AS month, is_approved,
+                   sum(amount) AS total_amount, count(*) AS row_count
+            FROM old_rows
+            GROUP BY 1, 2, 3, 4
+        ) o
+        WHERE r.department_id = o.department_id
+          AND r.vendor_id = o.vendor_id
+          AND r.month = o.month
+          AND r.is_approved = o.is_approved;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO expense_monthly_rollup AS r
+            (department_id, vendor_id, month, is_approved, total_amount, row_count)
+        SELECT department_id, vendor_id,
+               date_trunc('month', expense_date)::date, is_approved,
+               sum(amount), count(*)
+        FROM new_rows
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (department_id, vendor_id, month, is_approved) DO UPDATE
+        SET total_amount = r.total_amount + EXCLUDED.total_amount,
+            row_count = r.row_count + EXCLUDED.row_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_expense_rollup(since date DEFAULT NULL)
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE expenses IN SHARE MODE;
+
+    DELETE FROM expense_monthly_rollup
+    WHERE since IS NULL OR month >= date_trunc('month', since)::date;
+
+    INSERT INTO expense_monthly_rollup
+        (department_id, vendor_id, month, is_approved, total_amount, row_count)
+    SELECT department_id, vendor_id,
+           date_trunc('month', expense_date)::date, is_approved,
+           sum(amount), count(*)
+    FROM expenses
+    WHERE since IS NULL OR expense_date >= date_trunc('month', since)::date
+    GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS expenses_rollup_insert ON expenses;
+CREATE TRIGGER expenses_rollup_insert
+AFTER INSERT ON expenses
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION expense_rollup_apply();
+
+DROP TRIGGER IF EXISTS expenses_rollup_update ON expenses;
+CREATE TRIGGER expenses_rollup_update
+AFTER UPDATE ON expenses
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION expense_rollup_apply();
+
+DROP TRIGGER IF EXISTS expenses_rollup_delete ON expenses;
+CREATE TRIGGER expenses_rollup_delete
+AFTER DELETE ON expenses
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION expense_rollup_apply();
+
+CREATE OR REPLACE FUNCTION payroll_rollup_apply()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE payroll_monthly_rollup r
+        SET total_net = r.total_net - o.total_net,
+            row_count = r.row_count - o.row_count
+        FROM (
+            SELECT employee_id, date_trunc('month', period_end)::date AS month,
+                   is_paid, sum(net_amount) AS total_net, count(*) AS row_count
+            FROM old_rows
+            GROUP BY 1, 2, 3
+        ) o
+        WHERE r.employee_id = o.employee_id
+          AND r.month = o.month
+          AND r.is_paid = o.is_paid;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO payroll_monthly_rollup AS r
+            (department_id, employee_id, month, is_paid, total_net, row_count)
+        SELECT e.department_id, n.employee_id,
+               date_trunc('month', n.period_end)::date, n.is_paid,
+               sum(n.net_amount), count(*)
+        FROM new_rows n
+        JOIN employees e ON e.id = n.employee_id
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (department_id, employee_id, month, is_paid) DO UPDATE
+        SET total_net = r.total_net + EXCLUDED.total_net,
+            row_count = r.row_count + EXCLUDED.row_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION payroll_rollup_reassign()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE payroll_monthly_rollup r
+    SET department_id = n.department_id
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE r.employee_id = n.id
+      AND o.department_id <> n.department_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_payroll_rollup(since date DEFAULT NULL)
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE payrolls IN SHARE MODE;
+
+    DELETE FROM payroll_monthly_rollup
+    WHERE since IS NULL OR month >= date_trunc('month', since)::date;
+
+    INSERT INTO payroll_monthly_rollup
+        (department_id, employee_id, month, is_paid, total_net, row_count)
+    SELECT e.department_id, p.employee_id,
+           date_trunc('month', p.period_end)::date, p.is_paid,
+           sum(p.net_amount), count(*)
+    FROM payrolls p
+    JOIN employees e ON e.id = p.employee_id
+    WHERE since IS NULL OR p.period_end >= date_trunc('month', since)::date
+    GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS payrolls_rollup_insert ON payrolls;
+CREATE TRIGGER payrolls_rollup_insert
+AFTER INSERT ON payrolls
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_apply();
+
+DROP TRIGGER IF EXISTS payrolls_rollup_update ON payrolls;
+CREATE TRIGGER payrolls_rollup_update
+AFTER UPDATE ON payrolls
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_apply();
+
+DROP TRIGGER IF EXISTS payrolls_rollup_delete ON payrolls;
+CREATE TRIGGER payrolls_rollup_delete
+AFTER DELETE ON payrolls
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_apply();
+
+DROP TRIGGER IF EXISTS employees_rollup_reassign ON employees;
+CREATE TRIGGER employees_rollup_reassign
+AFTER UPDATE ON employees
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_reassign();
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM expense_monthly_rollup)
+       AND EXISTS (SELECT 1 FROM expenses) THEN
+        PERFORM rebuild_expense_rollup();
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM payroll_monthly_rollup)
+       AND EXISTS (SELECT 1 FROM payrolls) THEN
+        PERFORM rebuild_payroll_rollup();
+    END IF;
+END;
+$$;
@@ -47,22 +47,13 @@ VALUES
     (6, 6, '2024-02-01', '2024-02-29', 46000.00, NULL, FALSE),
     (7, 7, '2024-01-01', '2024-01-31', 42000.00, '2024-02-05 10:00:00', TRUE);
 
-INSERT INTO archive_log (id, source_table, payload)
+INSERT INTO payrolls_archive (id, employee_id, period_start, period_end, net_amount, paid_at, is_paid)
 VALUES
-    (
-        1,
-        'payrolls',
-        '{"id": 9001, "employee_id": 1, "period_start": "2023-09-01", "period_end": "2023-09-30", "net_amount": 50500.00, "paid_at": "2023-10-10T10:00:00", "is_paid": true}'
-    ),
-    (
-        2,
-        'payrolls',
-        '{"id": 9002, "employee_id": 2, "period_start": "2023-10-01", "period_end": "2023-10-31", "net_amount": 48200.00, "paid_at": "2023-11-10T10:00:00", "is_paid": true}'
-    );
+    (8, 1, '2023-09-01', '2023-09-30', 50500.00, '2023-10-10 10:00:00', TRUE),
+    (9, 2, '2023-10-01', '2023-10-31', 48200.00, '2023-11-10 10:00:00', TRUE);
 
 SELECT setval('departments_id_seq', 5, true);
 SELECT setval('employees_id_seq', 7, true);
 SELECT setval('vendors_id_seq', 5, true);
 SELECT setval('expenses_id_seq', 8, true);
-SELECT setval('payrolls_id_seq', 7, true);
-SELECT setval('archive_log_id_seq', 2, true);
+SELECT setval('payrolls_id_seq', 9, true);
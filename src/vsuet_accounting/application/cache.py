@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, Mapping, Optional, Sequence
+
+from vsuet_accounting.config import get_settings
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+def _normalise(value: Any) -> Hashable:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, _normalise(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_normalise(item) for item in value)
+    return value
+
+
+def _freeze(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+def estimate_size(value: Any) -> int:
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        if not value:
+            return sys.getsizeof(value)
+        sample = value[0]
+        items = sample.values() if isinstance(sample, Mapping) else (
+            sample if isinstance(sample, Sequence) and not isinstance(sample, str) else ()
+        )
+        row_size = sys.getsizeof(sample) + sum(sys.getsizeof(item) for item in items)
+        return sys.getsizeof(value) + row_size * len(value)
+    return sys.getsizeof(value)
+
+
+class ReportCache:
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl_seconds: float = 300,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._versions: defaultdict[str, int] = defaultdict(int)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+
+    def version(self, table: str) -> int:
+        with self._lock:
+            return self._versions[table]
+
+    def key(
+        self, name: str, tables: Iterable[str], filters: Mapping[str, Any]
+    ) -> Hashable:
+        with self._lock:
+            versions = tuple((table, self._versions[table]) for table in sorted(tables))
+        return name, _normalise(filters), versions
+
+    def lookup(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry.value
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return False, None
+
+    def get_or_compute(
+        self,
+        name: str,
+        tables: Iterable[str],
+        filters: Mapping[str, Any],
+        compute: Callable[[], Any],
+    ) -> Any:
+        key = self.key(name, tables, filters)
+        found, value = self.lookup(key)
+        if found:
+            return value
+        value = _freeze(compute())
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = _Entry(value, size, self._clock() + self.ttl_seconds)
+            self._bytes += size
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for table in list(self._versions):
+                self._versions[table] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _discard(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _evict(self) -> None:
+        now = self._clock()
+        for key in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            self._discard(key)
+            self.evictions += 1
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+
+class ReferenceCache:
+    def __init__(
+        self,
+        ttl_seconds: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._values: dict[str, tuple[tuple, float]] = {}
+        self._generations: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, name: str) -> tuple[Optional[tuple], int]:
+        with self._lock:
+            cached = self._values.get(name)
+            if cached is not None and cached[1] > self._clock():
+                self.hits += 1
+                return cached[0], self._generations[name]
+            self._values.pop(name, None)
+            self.misses += 1
+            return None, self._generations[name]
+
+    def _store(self, name: str, rows: Iterable[tuple], generation: int) -> tuple:
+        value = tuple(tuple(row) for row in rows)
+        with self._lock:
+            if self._generations[name] == generation:
+                self._values[name] = (value, self._clock() + self.ttl_seconds)
+        return value
+
+    def get(self, name: str, compute: Callable[[], Iterable[tuple]]) -> tuple:
+        value, generation = self._lookup(name)
+        if value is not None:
+            return value
+        return self._store(name, compute(), generation)
+
+    def invalidate(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._generations[name] += 1
+                self._values.pop(name, None)
+
+    def clear(self) -> None:
+        self.invalidate(*list(self._generations))
+
+
+@lru_cache
+def get_report_cache() -> ReportCache:
+    settings = get_settings()
+    return ReportCache(
+        max_entries=settings.report_cache_max_entries,
+        ttl_seconds=settings.report_cache_ttl_seconds,
+        max_bytes=settings.report_cache_max_mb * 1024 * 1024,
+    )
+
+
+@lru_cache
+def get_reference_cache() -> ReferenceCache:
+    return ReferenceCache(ttl_seconds=get_settings().reference_cache_ttl_seconds)
+
+
+def touch(*tables: str) -> None:
+    get_report_cache().bump(*tables)
+    get_reference_cache().invalidate(*tables)
+
+
+def clear_caches() -> None:
+    get_report_cache().clear()
+    get_reference_cache().clear()
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from pandas.api.types import union_categoricals
+from psycopg2.extensions import DECIMAL, new_type, register_type
+from sqlalchemy.orm import Session
+
+from vsuet_accounting.infrastructure.db.statements import (
+    get_statement_stats,
+    statements_instrumented,
+)
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+FRAME_BATCH_SIZE = 50_000
+
+DEC2FLOAT = new_type(
+    DECIMAL.values,
+    "DEC2FLOAT",
+    lambda value, cursor: float(value) if value is not None else None,
+)
+
+EXPENSES_REPORT_DTYPES = {
+    "expense_id": "int32",
+    "department": "category",
+    "vendor": "category",
+    "amount": "float64",
+    "expense_date": "date",
+    "is_approved": "bool",
+}
+
+PAYROLLS_REPORT_DTYPES = {
+    "payroll_id": "int32",
+    "employee": "category",
+    "period_start": "date",
+    "period_end": "date",
+    "net_amount": "float64",
+    "paid_at": "datetime",
+    "is_paid": "bool",
+    "archived_at": "datetime",
+}
+
+EXPENSES_SUMMARY_DTYPES = {"department": "category", "total_amount": "float64"}
+PAYROLLS_SUMMARY_DTYPES = {"department": "category", "total_net": "float64"}
+
+NUMPY_DTYPES = {"int32": np.int32, "float64": np.float64, "bool": np.bool_}
+DATETIME_UNITS = {"date": "s", "datetime": "us"}
+
+NULLABLE_DTYPES = {"int32": "Int32", "bool": "boolean"}
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def _arrow_dtypes() -> dict[str, Any]:
+    return {
+        "int32": pd.ArrowDtype(pa.int32()),
+        "float64": pd.ArrowDtype(pa.float64()),
+        "bool": pd.ArrowDtype(pa.bool_()),
+        "date": pd.ArrowDtype(pa.date32()),
+        "datetime": pd.ArrowDtype(pa.timestamp("us")),
+    }
+
+
+def _column(values: Sequence[Any], kind: str):
+    if kind == "category":
+        return pd.Categorical(values)
+    if kind in DATETIME_UNITS:
+        converted = pd.to_datetime(np.asarray(values, dtype=object))
+        return converted.as_unit(DATETIME_UNITS[kind]).to_numpy()
+    dtype = NUMPY_DTYPES.get(kind)
+    if dtype is None:
+        return np.asarray(values, dtype=object)
+    if kind in NULLABLE_DTYPES and None in values:
+        return pd.array(values, dtype=NULLABLE_DTYPES[kind])
+    return np.asarray(values, dtype=dtype)
+
+
+def _concat(parts: list, kind: str):
+    if len(parts) == 1:
+        return parts[0]
+    if kind == "category":
+        return union_categoricals(parts)
+    if all(isinstance(part, np.ndarray) for part in parts):
+        return np.concatenate(parts)
+    return pd.concat([pd.Series(part) for part in parts], ignore_index=True).array
+
+
+def _build_frame(
+    names: Sequence[str],
+    batches: Iterable[Sequence[tuple]],
+    dtypes: Mapping[str, str],
+    arrow: bool,
+) -> pd.DataFrame:
+    kinds = [dtypes.get(name, "object") for name in names]
+    parts: list[list] = [[] for _ in names]
+    for rows in batches:
+        for index, values in enumerate(zip(*rows)):
+            parts[index].append(_column(values, kinds[index]))
+
+    frame = pd.DataFrame(
+        {
+            name: _concat(columns, kind) if columns else _column((), kind)
+            for name, kind, columns in zip(names, kinds, parts)
+        }
+    )
+    if arrow:
+        if pa is None:
+            raise ImportError("pyarrow is required for Arrow-backed frames")
+        arrow_dtypes = _arrow_dtypes()
+        frame = frame.astype(
+            {
+                name: arrow_dtypes[kind]
+                for name, kind in zip(names, kinds)
+                if kind in arrow_dtypes
+            }
+        )
+    return frame
+
+
+def fetch_frame(
+    session: Session,
+    statement,
+    dtypes: Mapping[str, str],
+    batch_size: int = FRAME_BATCH_SIZE,
+    arrow: bool = False,
+) -> pd.DataFrame:
+    connection = session.connection()
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    cursor = connection.connection.cursor(name=f"frame_{uuid.uuid4().hex}")
+    register_type(DEC2FLOAT, cursor)
+    cursor.itersize = batch_size
+    stats = None
+    if statements_instrumented(connection.engine):
+        stats = get_statement_stats()
+    elapsed = 0.0
+    rows = 0
+
+    def timed(call, *args):
+        nonlocal elapsed
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            elapsed += time.perf_counter() - started
+
+    try:
+        timed(cursor.execute, compiled.string, compiled.params)
+        first = timed(cursor.fetchmany, batch_size)
+        names = [column[0] for column in cursor.description]
+
+        def batches():
+            nonlocal rows
+            chunk = first
+            while chunk:
+                rows += len(chunk)
+                yield chunk
+                chunk = timed(cursor.fetchmany, batch_size)
+
+        frame = _build_frame(names, batches(), dtypes, arrow)
+    except psycopg2.Error:
+        if stats is not None:
+            stats.record_error()
+        raise
+    finally:
+        cursor.close()
+    if stats is not None:
+        stats.record(compiled.string, compiled.params, elapsed, rows, False)
+    return frame
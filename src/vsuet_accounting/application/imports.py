@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import math
+import sys
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Union
+
+import pandas as pd
+import psycopg2
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from vsuet_accounting.application.cache import touch
+from vsuet_accounting.domain import schemas
+from vsuet_accounting.infrastructure.db import models
+from vsuet_accounting.infrastructure.export import export_csv_gz
+
+IMPORT_BATCH_SIZE = 5000
+MAX_AMOUNT = 10**10
+
+TRUE_VALUES = {"1", "true", "yes", "y", "да", "д", "+"}
+FALSE_VALUES = {"", "0", "false", "no", "n", "нет", "н", "-"}
+
+EXPENSE_COLUMNS = ("department_id", "vendor_id", "amount", "expense_date", "is_approved")
+PAYROLL_COLUMNS = (
+    "employee_id",
+    "period_start",
+    "period_end",
+    "net_amount",
+    "paid_at",
+    "is_paid",
+)
+
+EXPENSE_STAGING_SQL = """
+CREATE TEMP TABLE import_expenses (
+    department_id integer NOT NULL,
+    vendor_id integer NOT NULL,
+    amount numeric(12, 2) NOT NULL,
+    expense_date date NOT NULL,
+    is_approved boolean NOT NULL
+) ON COMMIT DROP
+"""
+
+EXPENSE_MERGE_SQL = """
+INSERT INTO expenses (department_id, vendor_id, amount, expense_date, is_approved)
+SELECT department_id, vendor_id, amount, expense_date, is_approved
+FROM import_expenses
+"""
+
+PAYROLL_STAGING_SQL = """
+CREATE TEMP TABLE import_payrolls (
+    employee_id integer NOT NULL,
+    period_start date NOT NULL,
+    period_end date NOT NULL,
+    net_amount numeric(12, 2) NOT NULL,
+    paid_at timestamp,
+    is_paid boolean NOT NULL
+) ON COMMIT DROP
+"""
+
+PAYROLL_MERGE_SQL = """
+INSERT INTO payrolls (employee_id, period_start, period_end, net_amount, paid_at, is_paid)
+SELECT employee_id, period_start, period_end, net_amount, paid_at, is_paid
+FROM import_payrolls
+"""
+
+
+def _key(value: Any) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def _lookup(pairs) -> dict[str, Optional[int]]:
+    lookup: dict[str, Optional[int]] = {}
+    for key, row_id in pairs:
+        if not key:
+            continue
+        key = _key(key)
+        lookup[key] = row_id if lookup.get(key, row_id) == row_id else None
+    return lookup
+
+
+def department_lookup(session: Session) -> dict[str, Optional[int]]:
+    rows = session.execute(
+        select(
+            models.Department.id, models.Department.code, models.Department.name
+        ).with_for_update(key_share=True)
+    ).all()
+    return _lookup(
+        [(code, row_id) for row_id, code, _ in rows]
+        + [(name, row_id) for row_id, _, name in rows]
+    )
+
+
+def vendor_lookup(session: Session) -> dict[str, Optional[int]]:
+    rows = session.execute(
+        select(
+            models.Vendor.id, models.Vendor.inn, models.Vendor.name
+        ).with_for_update(key_share=True)
+    ).all()
+    return _lookup(
+        [(inn, row_id) for row_id, inn, _ in rows]
+        + [(name, row_id) for row_id, _, name in rows]
+    )
+
+
+def employee_lookup(session: Session) -> dict[str, Optional[int]]:
+    rows = session.execute(
+        select(models.Employee.id, models.Employee.full_name).with_for_update(
+            key_share=True
+        )
+    ).all()
+    return _lookup((full_name, row_id) for row_id, full_name in rows)
+
+
+def read_batches(
+    source: Union[str, Path, IO[bytes]],
+    file_name: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> Iterator[pd.DataFrame]:
+    options = {"dtype": str, "keep_default_na": False}
+    if file_name.lower().endswith(".xls"):
+        raise ValueError(
+            "Формат .xls не поддерживается, сохраните файл как .xlsx или .csv"
+        )
+    if file_name.lower().endswith(".xlsx"):
+        frame = pd.read_excel(source, **options)
+        for start in range(0, len(frame), batch_size):
+            yield frame.iloc[start : start + batch_size]
+        return
+    yield from pd.read_csv(source, chunksize=batch_size, **options)
+
+
+def _bool(value: str) -> Union[bool, str]:
+    normalized = _key(value)
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    return value
+
+
+def _number(value: str) -> str:
+    return "".join(str(value).split()).replace(",", ".")
+
+
+def _resolve(
+    lookup: dict[str, Optional[int]], value: str, label: str
+) -> tuple[int, Optional[str]]:
+    key = _key(value)
+    if not key:
+        return 0, f"{label}: значение не указано"
+    if key not in lookup:
+        return 0, f"{label}: не найдено «{value}»"
+    if lookup[key] is None:
+        return 0, f"{label}: неоднозначное значение «{value}»"
+    return lookup[key], None
+
+
+def _validate(
+    model: type[BaseModel], values: dict[str, Any], errors: list[str]
+) -> Optional[BaseModel]:
+    try:
+        payload = model(**values)
+    except ValidationError as exc:
+        errors.extend(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()
+        )
+        return None
+    return None if errors else payload
+
+
+def _check_amount(value: float, label: str, errors: list[str]) -> None:
+    if not math.isfinite(value) or abs(round(value, 2)) >= MAX_AMOUNT:
+        errors.append(f"{label}: значение вне диапазона NUMERIC(12, 2)")
+
+
+def _expense_row(
+    row: dict[str, str], departments: dict, vendors: dict
+) -> tuple[Optional[BaseModel], list[str]]:
+    errors: list[str] = []
+    department_id, error = _resolve(departments, row.get("department", ""), "подразделение")
+    errors += [error] if error else []
+    vendor_id, error = _resolve(vendors, row.get("vendor", ""), "поставщик")
+    errors += [error] if error else []
+    payload = _validate(
+        schemas.ExpenseCreate,
+        {
+            "department_id": department_id,
+            "vendor_id": vendor_id,
+            "amount": _number(row.get("amount", "")),
+            "expense_date": row.get("expense_date", "").strip(),
+            "is_approved": _bool(row.get("is_approved", "")),
+        },
+        errors,
+    )
+    if payload is not None:
+        _check_amount(payload.amount, "amount", errors)
+    return (None if errors else payload), errors
+
+
+def _payroll_row(
+    row: dict[str, str], employees: dict
+) -> tuple[Optional[BaseModel], list[str]]:
+    errors: list[str] = []
+    employee_id, error = _resolve(employees, row.get("employee", ""), "сотрудник")
+    errors += [error] if error else []
+    payload = _validate(
+        schemas.PayrollCreate,
+        {
+            "employee_id": employee_id,
+            "period_start": row.get("period_start", "").strip(),
+            "period_end": row.get("period_end", "").strip(),
+            "net_amount": _number(row.get("net_amount", "")),
+            "paid_at": row.get("paid_at", "").strip() or None,
+            "is_paid": _bool(row.get("is_paid", "")),
+        },
+        errors,
+    )
+    if payload is not None:
+        _check_amount(payload.net_amount, "net_amount", errors)
+    return (None if errors else payload), errors
+
+
+def _copy_rows(
+    session: Session, table_name: str, columns: tuple[str, ...], payloads: list
+) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for payload in payloads:
+        values = payload.model_dump()
+        writer.writerow(["" if values[c] is None else values[c] for c in columns])
+    buffer.seek(0)
+
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    except psycopg2.Error as exc:
+        message = (exc.pgerror or str(exc)).strip()
+        raise ValueError(f"Не удалось загрузить строки: {message}") from exc
+    finally:
+        cursor.close()
+
+
+def _run_import(
+    session: Session,
+    batches: Iterator[pd.DataFrame],
+    kind: str,
+) -> dict[str, Any]:
+    if kind == "expenses":
+        departments = department_lookup(session)
+        vendors = vendor_lookup(session)
+        parse = lambda row: _expense_row(row, departments, vendors)  # noqa: E731
+        staging_sql, merge_sql = EXPENSE_STAGING_SQL, EXPENSE_MERGE_SQL
+        table_name, columns = "import_expenses", EXPENSE_COLUMNS
+    elif kind == "payrolls":
+        employees = employee_lookup(session)
+        parse = lambda row: _payroll_row(row, employees)  # noqa: E731
+        staging_sql, merge_sql = PAYROLL_STAGING_SQL, PAYROLL_MERGE_SQL
+        table_name, columns = "import_payrolls", PAYROLL_COLUMNS
+    else:
+        raise ValueError(f"Unknown import kind: {kind!r}")
+
+    total = 0
+    rejects: list[dict[str, Any]] = []
+    try:
+        session.execute(text(staging_sql))
+        for batch in batches:
+            batch.columns = [_key(column) for column in batch.columns]
+            valid = []
+            for row in batch.to_dict("records"):
+                total += 1
+                payload, errors = parse(row)
+                if errors:
+                    rejects.append({"row": total + 1, **row, "error": "; ".join(errors)})
+                else:
+                    valid.append(payload)
+            if valid:
+                _copy_rows(session, table_name, columns, valid)
+
+        imported = session.execute(text(merge_sql)).rowcount
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    touch(kind)
+
+    reject_file = None
+    if rejects:
+        reject_file, _ = export_csv_gz([rejects], f"import_{kind}_rejects")
+
+    return {
+        "total": total,
+        "imported": imported,
+        "rejected": len(rejects),
+        "reject_file": reject_file,
+    }
+
+
+def import_expenses(
+    session: Session,
+    source: Union[str, Path, IO[bytes]],
+    file_name: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict[str, Any]:
+    return _run_import(session, read_batches(source, file_name, batch_size), "expenses")
+
+
+def import_payrolls(
+    session: Session,
+    source: Union[str, Path, IO[bytes]],
+    file_name: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict[str, Any]:
+    return _run_import(session, read_batches(source, file_name, batch_size), "payrolls")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from vsuet_accounting.infrastructure.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Bulk import of expenses or payrolls from CSV/XLSX."
+    )
+    parser.add_argument("kind", choices=("expenses", "payrolls"))
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    importer = import_expenses if args.kind == "expenses" else import_payrolls
+    with SessionLocal() as session:
+        result = importer(session, args.path, args.path.name, args.batch_size)
+
+    print(
+        f"Rows: {result['total']}, imported: {result['imported']}, "
+        f"rejected: {result['rejected']}"
+    )
+    if result["reject_file"]:
+        print(f"Rejected rows: {result['reject_file']}")
+    return 0 if not result["rejected"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,189 @@
 from __future__ import annotations
 
-from datetime import date
-from typing import Any, Optional
-
-from sqlalchemy import func, select, text
+import base64
+import binascii
+import time
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import (
+    Integer,
+    Row,
+    RowMapping,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session, selectinload
 
+from vsuet_accounting.application.cache import (
+    get_reference_cache,
+    get_report_cache,
+    touch,
+)
+from vsuet_accounting.config import get_settings
 from vsuet_accounting.domain import schemas
 from vsuet_accounting.infrastructure.db import models
+from vsuet_accounting.infrastructure.db.partitioning import (
+    ensure_future_partitions,
+    is_partitioned,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ESTIMATED_COUNT_TABLES = ("expenses", "payrolls")
+PAGE_SIZE = 50
+REPORT_CHUNK_SIZE = 5000
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVE_LOCK_RETRIES = 5
+ARCHIVE_LOCK_WAIT_SECONDS = 1.0
+PAYROLL_NET_RATIO = 0.87
+
+EXPENSE_REPORT_TABLES = ("expenses", "departments", "vendors")
+PAYROLL_REPORT_TABLES = ("payrolls", "employees", "departments")
+ARCHIVE_TABLES = ("payrolls", "payrolls_archive")
+DEPARTMENT_CASCADE = (
+    "departments",
+    "employees",
+    "expenses",
+    "payrolls",
+    "payrolls_archive",
+)
+EMPLOYEE_CASCADE = ("employees", "payrolls", "payrolls_archive")
+VENDOR_CASCADE = ("vendors", "expenses")
+
+
+def encode_cursor(sort_value: date, row_id: int) -> str:
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        sort_value, row_id = raw.split("|")
+        return date.fromisoformat(sort_value), int(row_id)
+    except (ValueError, UnicodeError, binascii.Error) as exc:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from exc
+
+
+def _keyset_query(query, sort_column, id_column, cursor: Optional[str], limit: int):
+    if cursor:
+        query = query.where(
+            tuple_(sort_column, id_column) > tuple_(*decode_cursor(cursor))
+        )
+    return query.order_by(sort_column, id_column).limit(limit + 1)
+
+
+def _keyset_page(rows, limit: int, sort_key: str) -> tuple[list, Optional[str]]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_key), last.id)
+
+
+def _exact_count(model: type[models.Base]):
+    return select(func.count()).select_from(model).scalar_subquery()
+
+
+def _estimated_count(table_name: str):
+    return literal_column(
+        "(SELECT CASE WHEN max(c.reltuples) >= 0 "
+        "THEN sum(greatest(c.reltuples, 0))::bigint "
+        f"ELSE (SELECT count(*) FROM {table_name}) END "
+        f"FROM pg_class c WHERE c.oid = '{table_name}'::regclass "
+        "OR c.oid IN (SELECT i.inhrelid FROM pg_inherits i "
+        f"WHERE i.inhparent = '{table_name}'::regclass))"
+    )
+
+
+def _dashboard_columns(estimated: bool = False) -> list:
+    def count(model: type[models.Base]):
+        if estimated and model.__tablename__ in ESTIMATED_COUNT_TABLES:
+            return _estimated_count(model.__tablename__)
+        return _exact_count(model)
+
+    return [
+        count(models.Department).label("departments"),
+        count(models.Employee).label("employees"),
+        count(models.Vendor).label("vendors"),
+        count(models.Expense).label("expenses"),
+        count(models.Payroll).label("payrolls"),
+        select(func.coalesce(func.sum(models.Expense.amount), 0))
+        .where(~models.Expense.is_approved)
+        .scalar_subquery()
+        .label("unapproved_expenses_total"),
+        select(func.coalesce(func.sum(models.Payroll.net_amount), 0))
+        .where(~models.Payroll.is_paid)
+        .scalar_subquery()
+        .label("unpaid_payrolls_total"),
+    ]
+
+
+def dashboard_counts(session: Session, estimated: bool = False) -> dict[str, Any]:
+    query = select(*_dashboard_columns(estimated))
+    return dict(session.execute(query).mappings().one())
 
 
 def list_departments(session: Session) -> list[models.Department]:
     return session.scalars(select(models.Department).order_by(models.Department.name)).all()
 
 
+def list_departments_rows(session: Session) -> list[Row]:
+    query = select(
+        models.Department.id, models.Department.name, models.Department.code
+    ).order_by(models.Department.name)
+    return session.execute(query).all()
+
+
+def _options_query(name: str):
+    model, label = {
+        "departments": (models.Department, models.Department.name),
+        "vendors": (models.Vendor, models.Vendor.name),
+        "employees": (models.Employee, models.Employee.full_name),
+    }[name]
+    return select(model.id, label).order_by(label)
+
+
+def _options(
+    session: Session, name: str, required: Iterable[int] = ()
+) -> tuple[tuple[int, str], ...]:
+    cache = get_reference_cache()
+    compute = lambda: session.execute(_options_query(name)).all()  # noqa: E731
+    options = cache.get(name, compute)
+    if not set(required) <= {row_id for row_id, _ in options}:
+        cache.invalidate(name)
+        options = cache.get(name, compute)
+    return options
+
+
+def department_options(
+    session: Session, required: Iterable[int] = ()
+) -> tuple[tuple[int, str], ...]:
+    return _options(session, "departments", required)
+
+
 def create_department(
     session: Session, payload: schemas.DepartmentCreate
 ) -> models.Department:
     department = models.Department(**payload.model_dump())
     session.add(department)
     session.commit()
+    touch("departments")
     session.refresh(department)
     return department
 
@@ -33,6 +197,7 @@ def update_department(
     for key, value in payload.model_dump().items():
         setattr(department, key, value)
     session.commit()
+    touch("departments")
     session.refresh(department)
     return department
 
@@ -43,6 +208,7 @@ def delete_department(session: Session, department_id: int) -> bool:
         return False
     session.delete(department)
     session.commit()
+    touch(*DEPARTMENT_CASCADE)
     return True
 
 
@@ -55,12 +221,36 @@ def list_employees(session: Session) -> list[models.Employee]:
     return session.scalars(query).all()
 
 
+def list_employees_rows(session: Session) -> list[Row]:
+    query = (
+        select(
+            models.Employee.id,
+            models.Employee.full_name,
+            models.Department.name.label("department"),
+            models.Employee.hire_date,
+            models.Employee.base_salary,
+            models.Employee.is_active,
+            models.Employee.department_id,
+        )
+        .join(models.Department, models.Employee.department_id == models.Department.id)
+        .order_by(models.Employee.full_name)
+    )
+    return session.execute(query).all()
+
+
+def employee_options(
+    session: Session, required: Iterable[int] = ()
+) -> tuple[tuple[int, str], ...]:
+    return _options(session, "employees", required)
+
+
 def create_employee(
     session: Session, payload: schemas.EmployeeCreate
 ) -> models.Employee:
     employee = models.Employee(**payload.model_dump())
     session.add(employee)
     session.commit()
+    touch("employees")
     session.refresh(employee)
     return employee
 
@@ -74,6 +264,7 @@ def update_employee(
     for key, value in payload.model_dump().items():
         setattr(employee, key, value)
     session.commit()
+    touch("employees")
     session.refresh(employee)
     return employee
 
@@ -84,6 +275,7 @@ def delete_employee(session: Session, employee_id: int) -> bool:
         return False
     session.delete(employee)
     session.commit()
+    touch(*EMPLOYEE_CASCADE)
     return True
 
 
@@ -91,10 +283,24 @@ def list_vendors(session: Session) -> list[models.Vendor]:
     return session.scalars(select(models.Vendor).order_by(models.Vendor.name)).all()
 
 
+def list_vendors_rows(session: Session) -> list[Row]:
+    query = select(models.Vendor.id, models.Vendor.name, models.Vendor.inn).order_by(
+        models.Vendor.name
+    )
+    return session.execute(query).all()
+
+
+def vendor_options(
+    session: Session, required: Iterable[int] = ()
+) -> tuple[tuple[int, str], ...]:
+    return _options(session, "vendors", required)
+
+
 def create_vendor(session: Session, payload: schemas.VendorCreate) -> models.Vendor:
     vendor = models.Vendor(**payload.model_dump())
     session.add(vendor)
     session.commit()
+    touch("vendors")
     session.refresh(vendor)
     return vendor
 
@@ -108,6 +314,7 @@ def update_vendor(
     for key, value in payload.model_dump().items():
         setattr(vendor, key, value)
     session.commit()
+    touch("vendors")
     session.refresh(vendor)
     return vendor
 
@@ -118,6 +325,7 @@ def delete_vendor(session: Session, vendor_id: int) -> bool:
         return False
     session.delete(vendor)
     session.commit()
+    touch(*VENDOR_CASCADE)
     return True
 
 
@@ -130,12 +338,58 @@ def list_expenses(session: Session) -> list[models.Expense]:
     return session.scalars(query).all()
 
 
+def list_expenses_page(
+    session: Session, cursor: Optional[str] = None, limit: int = PAGE_SIZE
+) -> tuple[list[models.Expense], Optional[str]]:
+    query = _keyset_query(
+        select(models.Expense).options(
+            selectinload(models.Expense.department), selectinload(models.Expense.vendor)
+        ),
+        models.Expense.expense_date,
+        models.Expense.id,
+        cursor,
+        limit,
+    )
+    return _keyset_page(session.scalars(query).all(), limit, "expense_date")
+
+
+def _expenses_rows_query():
+    return (
+        select(
+            models.Expense.id,
+            models.Department.name.label("department"),
+            models.Vendor.name.label("vendor"),
+            models.Expense.amount,
+            models.Expense.expense_date,
+            models.Expense.is_approved,
+            models.Expense.department_id,
+            models.Expense.vendor_id,
+        )
+        .join(models.Department, models.Expense.department_id == models.Department.id)
+        .join(models.Vendor, models.Expense.vendor_id == models.Vendor.id)
+    )
+
+
+def list_expenses_rows(
+    session: Session, cursor: Optional[str] = None, limit: int = PAGE_SIZE
+) -> tuple[list[Row], Optional[str]]:
+    query = _keyset_query(
+        _expenses_rows_query(),
+        models.Expense.expense_date,
+        models.Expense.id,
+        cursor,
+        limit,
+    )
+    return _keyset_page(session.execute(query).all(), limit, "expense_date")
+
+
 def create_expense(
     session: Session, payload: schemas.ExpenseCreate
 ) -> models.Expense:
     expense = models.Expense(**payload.model_dump())
     session.add(expense)
     session.commit()
+    touch("expenses")
     session.refresh(expense)
     return expense
 
@@ -149,6 +403,7 @@ def update_expense(
     for key, value in payload.model_dump().items():
         setattr(expense, key, value)
     session.commit()
+    touch("expenses")
     session.refresh(expense)
     return expense
 
@@ -159,6 +414,7 @@ def delete_expense(session: Session, expense_id: int) -> bool:
         return False
     session.delete(expense)
     session.commit()
+    touch("expenses")
     return True
 
 
@@ -171,12 +427,52 @@ def list_payrolls(session: Session) -> list[models.Payroll]:
     return session.scalars(query).all()
 
 
+def list_payrolls_page(
+    session: Session, cursor: Optional[str] = None, limit: int = PAGE_SIZE
+) -> tuple[list[models.Payroll], Optional[str]]:
+    query = _keyset_query(
+        select(models.Payroll).options(selectinload(models.Payroll.employee)),
+        models.Payroll.period_end,
+        models.Payroll.id,
+        cursor,
+        limit,
+    )
+    return _keyset_page(session.scalars(query).all(), limit, "period_end")
+
+
+def _payrolls_rows_query():
+    return select(
+        models.Payroll.id,
+        models.Employee.full_name.label("employee"),
+        models.Payroll.period_start,
+        models.Payroll.period_end,
+        models.Payroll.net_amount,
+        models.Payroll.paid_at,
+        models.Payroll.is_paid,
+        models.Payroll.employee_id,
+    ).join(models.Employee, models.Payroll.employee_id == models.Employee.id)
+
+
+def list_payrolls_rows(
+    session: Session, cursor: Optional[str] = None, limit: int = PAGE_SIZE
+) -> tuple[list[Row], Optional[str]]:
+    query = _keyset_query(
+        _payrolls_rows_query(),
+        models.Payroll.period_end,
+        models.Payroll.id,
+        cursor,
+        limit,
+    )
+    return _keyset_page(session.execute(query).all(), limit, "period_end")
+
+
 def create_payroll(
     session: Session, payload: schemas.PayrollCreate
 ) -> models.Payroll:
     payroll = models.Payroll(**payload.model_dump())
     session.add(payroll)
     session.commit()
+    touch("payrolls")
     session.refresh(payroll)
     return payroll
 
@@ -190,6 +486,7 @@ def update_payroll(
     for key, value in payload.model_dump().items():
         setattr(payroll, key, value)
     session.commit()
+    touch("payrolls")
     session.refresh(payroll)
     return payroll
 
@@ -200,17 +497,171 @@ def delete_payroll(session: Session, payroll_id: int) -> bool:
         return False
     session.delete(payroll)
     session.commit()
+    touch("payrolls")
     return True
 
 
-def expenses_report(
+def _ids_filter(id_column, ids: Sequence[int]):
+    return id_column == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+
+
+def _bulk_execute(session: Session, statement, *tables: str) -> int:
+    try:
+        result = session.execute(
+            statement.execution_options(synchronize_session=False)
+        )
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    touch(*tables)
+    return result.rowcount
+
+
+def set_expenses_approved(
+    session: Session,
+    ids: Optional[Sequence[int]] = None,
+    department_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    approved: bool = True,
+) -> int:
+    conditions = []
+    if ids is not None:
+        conditions.append(_ids_filter(models.Expense.id, ids))
+    if department_id:
+        conditions.append(models.Expense.department_id == department_id)
+    if vendor_id:
+        conditions.append(models.Expense.vendor_id == vendor_id)
+    if date_from:
+        conditions.append(models.Expense.expense_date >= date_from)
+    if date_to:
+        conditions.append(models.Expense.expense_date <= date_to)
+    if not conditions:
+        raise ValueError("Bulk approval needs ids or at least one filter")
+
+    statement = (
+        update(models.Expense)
+        .where(*conditions, models.Expense.is_approved != approved)
+        .values(is_approved=approved)
+    )
+    return _bulk_execute(session, statement, "expenses")
+
+
+def delete_expenses(session: Session, ids: Sequence[int]) -> int:
+    if not ids:
+        return 0
+    statement = delete(models.Expense).where(_ids_filter(models.Expense.id, ids))
+    return _bulk_execute(session, statement, "expenses")
+
+
+def mark_payrolls_paid(
+    session: Session, ids: Sequence[int], paid_at: Optional[datetime] = None
+) -> int:
+    if not ids:
+        return 0
+    statement = (
+        update(models.Payroll)
+        .where(_ids_filter(models.Payroll.id, ids), ~models.Payroll.is_paid)
+        .values(is_paid=True, paid_at=paid_at or func.now())
+    )
+    return _bulk_execute(session, statement, "payrolls")
+
+
+def delete_payrolls(session: Session, ids: Sequence[int]) -> int:
+    if not ids:
+        return 0
+    statement = delete(models.Payroll).where(_ids_filter(models.Payroll.id, ids))
+    return _bulk_execute(session, statement, "payrolls")
+
+
+def reassign_employees(
+    session: Session, ids: Sequence[int], department_id: int
+) -> int:
+    if not ids:
+        return 0
+    statement = (
+        update(models.Employee)
+        .where(
+            _ids_filter(models.Employee.id, ids),
+            models.Employee.department_id != department_id,
+        )
+        .values(department_id=department_id)
+    )
+    return _bulk_execute(session, statement, "employees")
+
+
+def generate_payroll_run(
     session: Session,
+    period_start: date,
+    period_end: date,
+    department_id: Optional[int] = None,
+    net_ratio: float = PAYROLL_NET_RATIO,
+) -> dict[str, Any]:
+    if period_start > period_end:
+        raise ValueError("period_start must not be after period_end")
+
+    employee = models.Employee
+    payroll = models.Payroll
+    eligible = employee.is_active.is_(True)
+    if department_id is not None:
+        eligible = eligible & (employee.department_id == department_id)
+
+    archive = models.PayrollArchive
+    already_generated = exists().where(
+        payroll.employee_id == employee.id,
+        payroll.period_start == period_start,
+        payroll.period_end == period_end,
+    )
+    already_archived = exists().where(
+        archive.employee_id == employee.id,
+        archive.period_start == period_start,
+        archive.period_end == period_end,
+    )
+    rows = select(
+        employee.id,
+        literal(period_start),
+        literal(period_end),
+        func.round(employee.base_salary * literal(net_ratio), 2),
+        literal(False),
+    ).where(eligible, ~already_generated, ~already_archived)
+    statement = (
+        insert(payroll)
+        .from_select(
+            ["employee_id", "period_start", "period_end", "net_amount", "is_paid"],
+            rows,
+        )
+        .returning(payroll.net_amount)
+    )
+
+    try:
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext('payroll_run'))")
+        )
+        total = session.scalar(select(func.count()).select_from(employee).where(eligible))
+        amounts = session.scalars(statement).all()
+        session.commit()
+        touch("payrolls")
+    except BaseException:
+        session.rollback()
+        raise
+
+    return {
+        "employees": total,
+        "created": len(amounts),
+        "skipped": total - len(amounts),
+        "total_net": float(sum(amounts, 0)),
+    }
+
+
+def _expenses_report_query(
     department_id: Optional[int] = None,
     vendor_id: Optional[int] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     approved_only: bool = False,
-) -> list[dict[str, Any]]:
+):
     query = (
         select(
             models.Expense.id.label("expense_id"),
@@ -235,39 +686,227 @@ def expenses_report(
     if approved_only:
         query = query.where(models.Expense.is_approved.is_(True))
 
-    return session.execute(query.order_by(models.Expense.expense_date)).mappings().all()
+    return query.order_by(models.Expense.expense_date)
 
 
-def expenses_summary(
+def _stream_chunks(
+    session: Session, statement, chunk_size: int
+) -> Iterator[Sequence[RowMapping]]:
+    result = session.execute(
+        statement,
+        execution_options={"stream_results": True, "yield_per": chunk_size},
+    )
+    try:
+        yield from result.mappings().partitions()
+    finally:
+        result.close()
+
+
+def expenses_report(
     session: Session,
+    department_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
-) -> list[dict[str, Any]]:
-    query = (
+    approved_only: bool = False,
+) -> tuple[RowMapping, ...]:
+    query = _expenses_report_query(
+        department_id, vendor_id, date_from, date_to, approved_only
+    )
+    return get_report_cache().get_or_compute(
+        "expenses_report",
+        EXPENSE_REPORT_TABLES,
+        {
+            "department_id": department_id,
+            "vendor_id": vendor_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "approved_only": approved_only,
+        },
+        lambda: session.execute(query).mappings().all(),
+    )
+
+
+def expenses_report_frame(
+    session: Session,
+    department_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    approved_only: bool = False,
+) -> pd.DataFrame:
+    from vsuet_accounting.application import frames
+
+    query = _expenses_report_query(
+        department_id, vendor_id, date_from, date_to, approved_only
+    )
+    arrow = get_settings().report_frames_arrow
+    frame = get_report_cache().get_or_compute(
+        "expenses_report_frame",
+        EXPENSE_REPORT_TABLES,
+        {
+            "department_id": department_id,
+            "vendor_id": vendor_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "approved_only": approved_only,
+            "arrow": arrow,
+        },
+        lambda: frames.fetch_frame(
+            session, query, frames.EXPENSES_REPORT_DTYPES, arrow=arrow
+        ),
+    )
+    return frame.copy(deep=True)
+
+
+def iter_expenses_report(
+    session: Session,
+    department_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    approved_only: bool = False,
+    chunk_size: int = REPORT_CHUNK_SIZE,
+) -> Iterator[Sequence[RowMapping]]:
+    query = _expenses_report_query(
+        department_id, vendor_id, date_from, date_to, approved_only
+    )
+    return _stream_chunks(session, query, chunk_size)
+
+
+def _next_month(value: date) -> date:
+    return (value.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _rollup_window(
+    date_from: Optional[date], date_to: Optional[date]
+) -> Optional[tuple[Optional[date], Optional[date], list[tuple[date, date]]]]:
+    months_from = None
+    if date_from:
+        months_from = date_from if date_from.day == 1 else _next_month(date_from)
+    months_to = None
+    if date_to:
+        month_end = _next_month(date_to) - timedelta(days=1)
+        months_to = _next_month(date_to) if date_to == month_end else date_to.replace(day=1)
+
+    if months_from and months_to and months_from >= months_to:
+        return None
+
+    edges: list[tuple[date, date]] = []
+    if date_from and date_from < months_from:
+        edges.append((date_from, months_from - timedelta(days=1)))
+    if date_to and months_to <= date_to:
+        edges.append((months_to, date_to))
+    return months_from, months_to, edges
+
+
+def _summary_from_parts(parts, total_label: str):
+    totals = union_all(*parts).subquery()
+    return (
         select(
             models.Department.name.label("department"),
-            func.sum(models.Expense.amount).label("total_amount"),
+            func.sum(totals.c.total).label(total_label),
         )
-        .join(models.Expense, models.Department.id == models.Expense.department_id)
+        .join(totals, models.Department.id == totals.c.department_id)
         .group_by(models.Department.name)
+        .having(func.sum(totals.c.row_count) > 0)
+        .order_by(models.Department.name)
     )
 
+
+def _expense_totals(date_from: Optional[date], date_to: Optional[date]):
+    query = select(
+        models.Expense.department_id,
+        func.sum(models.Expense.amount).label("total"),
+        func.count().label("row_count"),
+    ).group_by(models.Expense.department_id)
+
     if date_from:
         query = query.where(models.Expense.expense_date >= date_from)
     if date_to:
         query = query.where(models.Expense.expense_date <= date_to)
+    return query
 
-    return session.execute(query.order_by(models.Department.name)).mappings().all()
 
+def _expense_rollup_totals(months_from: Optional[date], months_to: Optional[date]):
+    rollup = models.ExpenseMonthlyRollup
+    query = select(
+        rollup.department_id,
+        func.sum(rollup.total_amount).label("total"),
+        func.sum(rollup.row_count).label("row_count"),
+    ).group_by(rollup.department_id)
 
-def payrolls_report(
+    if months_from:
+        query = query.where(rollup.month >= months_from)
+    if months_to:
+        query = query.where(rollup.month < months_to)
+    return query
+
+
+def _expenses_summary_query(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    use_rollup: bool = True,
+):
+    window = _rollup_window(date_from, date_to) if use_rollup else None
+    if window is None:
+        parts = [_expense_totals(date_from, date_to)]
+    else:
+        months_from, months_to, edges = window
+        parts = [_expense_rollup_totals(months_from, months_to)]
+        parts.extend(_expense_totals(start, end) for start, end in edges)
+
+    return _summary_from_parts(parts, "total_amount")
+
+
+def expenses_summary(
+    session: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    use_rollup: bool = True,
+) -> tuple[RowMapping, ...]:
+    query = _expenses_summary_query(date_from, date_to, use_rollup)
+    return get_report_cache().get_or_compute(
+        "expenses_summary",
+        EXPENSE_REPORT_TABLES,
+        {"date_from": date_from, "date_to": date_to, "use_rollup": use_rollup},
+        lambda: session.execute(query).mappings().all(),
+    )
+
+
+def expenses_summary_frame(
     session: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    use_rollup: bool = True,
+) -> pd.DataFrame:
+    from vsuet_accounting.application import frames
+
+    query = _expenses_summary_query(date_from, date_to, use_rollup)
+    arrow = get_settings().report_frames_arrow
+    frame = get_report_cache().get_or_compute(
+        "expenses_summary_frame",
+        EXPENSE_REPORT_TABLES,
+        {
+            "date_from": date_from,
+            "date_to": date_to,
+            "use_rollup": use_rollup,
+            "arrow": arrow,
+        },
+        lambda: frames.fetch_frame(
+            session, query, frames.EXPENSES_SUMMARY_DTYPES, arrow=arrow
+        ),
+    )
+    return frame.copy(deep=True)
+
+
+def _payrolls_report_statement(
     employee_id: Optional[int] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     paid_only: Optional[bool] = None,
     include_archived: bool = False,
-) -> list[dict[str, Any]]:
+):
     if not include_archived:
         query = (
             select(
@@ -291,7 +930,7 @@ def payrolls_report(
         if paid_only is not None:
             query = query.where(models.Payroll.is_paid.is_(paid_only))
 
-        return session.execute(query.order_by(models.Payroll.period_end)).mappings().all()
+        return query.order_by(models.Payroll.period_end)
 
     sql = """
         SELECT
@@ -324,30 +963,171 @@ def payrolls_report(
 
     sql += " ORDER BY p.period_end"
 
-    return session.execute(text(sql), params).mappings().all()
+    return text(sql).bindparams(**params)
 
 
-def payrolls_summary(
+def payrolls_report(
+    session: Session,
+    employee_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    paid_only: Optional[bool] = None,
+    include_archived: bool = False,
+) -> tuple[RowMapping, ...]:
+    statement = _payrolls_report_statement(
+        employee_id, date_from, date_to, paid_only, include_archived
+    )
+    tables = PAYROLL_REPORT_TABLES + (ARCHIVE_TABLES if include_archived else ())
+    return get_report_cache().get_or_compute(
+        "payrolls_report",
+        tables,
+        {
+            "employee_id": employee_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "paid_only": paid_only,
+            "include_archived": include_archived,
+        },
+        lambda: session.execute(statement).mappings().all(),
+    )
+
+
+def payrolls_report_frame(
+    session: Session,
+    employee_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    paid_only: Optional[bool] = None,
+    include_archived: bool = False,
+) -> pd.DataFrame:
+    from vsuet_accounting.application import frames
+
+    statement = _payrolls_report_statement(
+        employee_id, date_from, date_to, paid_only, include_archived
+    )
+    tables = PAYROLL_REPORT_TABLES + (ARCHIVE_TABLES if include_archived else ())
+    arrow = get_settings().report_frames_arrow
+    frame = get_report_cache().get_or_compute(
+        "payrolls_report_frame",
+        tables,
+        {
+            "employee_id": employee_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "paid_only": paid_only,
+            "include_archived": include_archived,
+            "arrow": arrow,
+        },
+        lambda: frames.fetch_frame(
+            session, statement, frames.PAYROLLS_REPORT_DTYPES, arrow=arrow
+        ),
+    )
+    return frame.copy(deep=True)
+
+
+def iter_payrolls_report(
     session: Session,
+    employee_id: Optional[int] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
-) -> list[dict[str, Any]]:
+    paid_only: Optional[bool] = None,
+    include_archived: bool = False,
+    chunk_size: int = REPORT_CHUNK_SIZE,
+) -> Iterator[Sequence[RowMapping]]:
+    statement = _payrolls_report_statement(
+        employee_id, date_from, date_to, paid_only, include_archived
+    )
+    return _stream_chunks(session, statement, chunk_size)
+
+
+def _payroll_totals(date_from: Optional[date], date_to: Optional[date]):
     query = (
         select(
-            models.Department.name.label("department"),
-            func.sum(models.Payroll.net_amount).label("total_net"),
+            models.Employee.department_id,
+            func.sum(models.Payroll.net_amount).label("total"),
+            func.count().label("row_count"),
         )
         .join(models.Employee, models.Payroll.employee_id == models.Employee.id)
-        .join(models.Department, models.Employee.department_id == models.Department.id)
-        .group_by(models.Department.name)
+        .group_by(models.Employee.department_id)
     )
 
     if date_from:
         query = query.where(models.Payroll.period_end >= date_from)
     if date_to:
         query = query.where(models.Payroll.period_end <= date_to)
+    return query
+
+
+def _payroll_rollup_totals(months_from: Optional[date], months_to: Optional[date]):
+    rollup = models.PayrollMonthlyRollup
+    query = select(
+        rollup.department_id,
+        func.sum(rollup.total_net).label("total"),
+        func.sum(rollup.row_count).label("row_count"),
+    ).group_by(rollup.department_id)
+
+    if months_from:
+        query = query.where(rollup.month >= months_from)
+    if months_to:
+        query = query.where(rollup.month < months_to)
+    return query
+
+
+def _payrolls_summary_query(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    use_rollup: bool = True,
+):
+    window = _rollup_window(date_from, date_to) if use_rollup else None
+    if window is None:
+        parts = [_payroll_totals(date_from, date_to)]
+    else:
+        months_from, months_to, edges = window
+        parts = [_payroll_rollup_totals(months_from, months_to)]
+        parts.extend(_payroll_totals(start, end) for start, end in edges)
 
-    return session.execute(query.order_by(models.Department.name)).mappings().all()
+    return _summary_from_parts(parts, "total_net")
+
+
+def payrolls_summary(
+    session: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    use_rollup: bool = True,
+) -> tuple[RowMapping, ...]:
+    query = _payrolls_summary_query(date_from, date_to, use_rollup)
+    return get_report_cache().get_or_compute(
+        "payrolls_summary",
+        PAYROLL_REPORT_TABLES,
+        {"date_from": date_from, "date_to": date_to, "use_rollup": use_rollup},
+        lambda: session.execute(query).mappings().all(),
+    )
+
+
+def payrolls_summary_frame(
+    session: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    use_rollup: bool = True,
+) -> pd.DataFrame:
+    from vsuet_accounting.application import frames
+
+    query = _payrolls_summary_query(date_from, date_to, use_rollup)
+    arrow = get_settings().report_frames_arrow
+    frame = get_report_cache().get_or_compute(
+        "payrolls_summary_frame",
+        PAYROLL_REPORT_TABLES,
+        {
+            "date_from": date_from,
+            "date_to": date_to,
+            "use_rollup": use_rollup,
+            "arrow": arrow,
+        },
+        lambda: frames.fetch_frame(
+            session, query, frames.PAYROLLS_SUMMARY_DTYPES, arrow=arrow
+        ),
+    )
+    return frame.copy(deep=True)
 
 
 def run_archive(session: Session, cutoff_date: date) -> int:
@@ -356,5 +1136,97 @@ def run_archive(session: Session, cutoff_date: date) -> int:
         {"cutoff_date": cutoff_date},
     ).mappings()
     session.commit()
+    touch(*ARCHIVE_TABLES)
     row = result.first()
     return int(row["moved"]) if row else 0
+
+
+def archive_preview(session: Session, cutoff_date: date) -> dict[str, Any]:
+    row = session.execute(
+        text(
+            """
+            SELECT
+                count(*) AS rows,
+                coalesce(sum(pg_column_size(p.*)), 0) AS estimated_bytes,
+                min(p.period_end) AS oldest_period_end,
+                max(p.period_end) AS newest_period_end
+            FROM payrolls p
+            WHERE p.period_end < :cutoff_date
+            """
+        ),
+        {"cutoff_date": cutoff_date},
+    ).mappings().one()
+    return dict(row)
+
+
+def archive_remaining(session: Session, cutoff_date: date) -> bool:
+    query = select(exists().where(models.Payroll.period_end < cutoff_date))
+    return bool(session.scalar(query))
+
+
+def run_archive_batches(
+    session: Session, cutoff_date: date, batch_size: int = ARCHIVE_BATCH_SIZE
+) -> Iterator[int]:
+    moved_total = 0
+    if is_partitioned(session.connection(), "payrolls"):
+        while True:
+            moved = session.scalar(
+                text("SELECT archive_payroll_partition(:cutoff_date)"),
+                {"cutoff_date": cutoff_date},
+            )
+            session.commit()
+            touch(*ARCHIVE_TABLES)
+            if moved is None:
+                break
+            moved_total += moved
+            yield moved_total
+
+    retries = 0
+    while True:
+        moved = session.scalar(
+            text("SELECT archive_payrolls_batch(:cutoff_date, :batch_size)"),
+            {"cutoff_date": cutoff_date, "batch_size": batch_size},
+        )
+        session.commit()
+        touch(*ARCHIVE_TABLES)
+        if moved:
+            retries = 0
+            moved_total += moved
+            yield moved_total
+            continue
+        if not archive_remaining(session, cutoff_date):
+            return
+        retries += 1
+        if retries > ARCHIVE_LOCK_RETRIES:
+            return
+        time.sleep(ARCHIVE_LOCK_WAIT_SECONDS)
+
+
+def ensure_partitions(session: Session) -> int:
+    settings = get_settings()
+    if settings.partitioning == "none":
+        return 0
+    created = ensure_future_partitions(
+        session.connection(), settings.partitioning, settings.partition_premake
+    )
+    session.commit()
+    return created
+
+
+def list_partitions(session: Session) -> list[dict[str, Any]]:
+    query = text(
+        """
+        SELECT
+            parent.relname AS table_name,
+            child.relname AS partition_name,
+            pg_get_expr(child.relpartbound, child.oid) AS bounds,
+            greatest(child.reltuples, 0)::bigint AS estimated_rows,
+            pg_total_relation_size(child.oid) AS total_bytes
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname IN ('expenses', 'payrolls')
+        ORDER BY parent.relname, child.relname
+        """
+    )
+    return session.execute(query).mappings().all()
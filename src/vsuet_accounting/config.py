@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,7 +21,35 @@ class Settings(BaseSettings):
     postgres_user: str = "vsuet"
     postgres_password: str = "vsuet_password"
 
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_statement_timeout_ms: int = 0
+    db_application_name: str = "vsuet_accounting"
+    db_statement_stats: bool = True
+    db_statement_stats_max: int = 500
+    db_slow_query_ms: int = 500
+    db_slow_query_log_size: int = 50
+
     backup_dir: str = "/app/backups"
+    backup_format: Literal["plain", "custom", "directory"] = "custom"
+    backup_jobs: int = 4
+    backup_compress: int = 6
+    backup_exclude_table_data: list[str] = []
+    backup_keep_daily: int = 7
+    backup_keep_weekly: int = 4
+    backup_keep_monthly: int = 6
+    archive_segment_batch_size: int = 10_000
+
+    partitioning: Literal["none", "month", "year"] = "none"
+    partition_premake: int = 3
+
+    report_cache_ttl_seconds: int = 300
+    report_cache_max_entries: int = 128
+    report_cache_max_mb: int = 64
+    reference_cache_ttl_seconds: int = 60
+    report_frames_arrow: bool = False
 
     @property
     def database_url(self) -> str:
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from vsuet_accounting.config import get_settings
+from vsuet_accounting.infrastructure.backup import file_checksum, get_backup_dir
+from vsuet_accounting.infrastructure.db import models
+
+SEGMENT_DIR = "archive_log"
+SEGMENT_MANIFEST = "manifest.json"
+EXPORT_LOCK_KEY = 7_301_003
+EMPTY_SNAPSHOT = "3:3:"
+
+SNAPSHOT_SQL = """
+SELECT
+    pg_current_snapshot()::text AS snapshot,
+    pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS xmin
+"""
+
+NEW_ROWS_SQL = """
+SELECT id, source_table, archived_at, payload
+FROM archive_log
+WHERE txid IS NULL AND id > :watermark
+UNION ALL
+SELECT id, source_table, archived_at, payload
+FROM archive_log
+WHERE txid >= :previous_xmin
+  AND pg_visible_in_snapshot(txid::text::xid8, CAST(:current AS pg_snapshot))
+  AND NOT pg_visible_in_snapshot(txid::text::xid8, CAST(:previous AS pg_snapshot))
+ORDER BY id
+"""
+
+
+def get_segment_dir() -> Path:
+    segment_dir = get_backup_dir() / SEGMENT_DIR
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    return segment_dir
+
+
+def load_segment_manifest() -> dict[str, Any]:
+    manifest_file = get_segment_dir() / SEGMENT_MANIFEST
+    if not manifest_file.exists():
+        return {"watermark": 0, "snapshot": None, "segments": []}
+    manifest = json.loads(manifest_file.read_text())
+    manifest.setdefault("snapshot", None)
+    return manifest
+
+
+def _write_segment_manifest(manifest: dict[str, Any]) -> None:
+    manifest_file = get_segment_dir() / SEGMENT_MANIFEST
+    temp_file = manifest_file.with_suffix(".tmp")
+    temp_file.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    temp_file.replace(manifest_file)
+
+
+def _segment_line(row: Any) -> str:
+    return json.dumps(
+        {
+            "id": row.id,
+            "source_table": row.source_table,
+            "archived_at": row.archived_at.isoformat(),
+            "payload": row.payload,
+        },
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+def _snapshot_xmin(snapshot: str) -> int:
+    return int(snapshot.split(":", 1)[0])
+
+
+def export_archive_log(
+    session: Session, batch_size: Optional[int] = None
+) -> Optional[dict[str, Any]]:
+    batch_size = batch_size or get_settings().archive_segment_batch_size
+    try:
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": EXPORT_LOCK_KEY}
+        )
+        manifest = load_segment_manifest()
+        watermark = manifest["watermark"]
+        current = session.execute(text(SNAPSHOT_SQL)).one()
+        previous = manifest["snapshot"] or EMPTY_SNAPSHOT
+        if _snapshot_xmin(previous) > current.xmin:
+            previous = EMPTY_SNAPSHOT
+
+        segment_dir = get_segment_dir()
+        temp_file = segment_dir / f"segment_{watermark + 1:012d}.part"
+        rows = 0
+        first_id = last_id = None
+        try:
+            with gzip.open(temp_file, "wt", encoding="utf-8") as stream:
+                result = session.execute(
+                    text(NEW_ROWS_SQL),
+                    {
+                        "watermark": watermark,
+                        "current": current.snapshot,
+                        "previous": previous,
+                        "previous_xmin": _snapshot_xmin(previous),
+                    },
+                    execution_options={"stream_results": True, "yield_per": batch_size},
+                )
+                for partition in result.partitions():
+                    for row in partition:
+                        stream.write(_segment_line(row))
+                        stream.write("\n")
+                    first_id = partition[0].id if first_id is None else first_id
+                    last_id = partition[-1].id
+                    rows += len(partition)
+            if not rows:
+                temp_file.unlink(missing_ok=True)
+                return None
+            segment_file = segment_dir / f"segment_{first_id:012d}_{last_id:012d}.jsonl.gz"
+            temp_file.replace(segment_file)
+        except BaseException:
+            temp_file.unlink(missing_ok=True)
+            raise
+
+        segment = {
+            "name": segment_file.name,
+            "first_id": first_id,
+            "last_id": last_id,
+            "rows": rows,
+            "snapshot": current.snapshot,
+            "size_bytes": segment_file.stat().st_size,
+            "sha256": file_checksum(segment_file),
+            "created_at": datetime.now().isoformat(),
+        }
+        manifest["segments"].append(segment)
+        manifest["watermark"] = max(watermark, last_id)
+        manifest["snapshot"] = current.snapshot
+        _write_segment_manifest(manifest)
+        return segment
+    finally:
+        session.rollback()
+
+
+def _read_segment(segment_file: Path) -> Iterable[dict[str, Any]]:
+    with gzip.open(segment_file, "rt", encoding="utf-8") as stream:
+        for line in stream:
+            item = json.loads(line)
+            item["archived_at"] = datetime.fromisoformat(item["archived_at"])
+            yield item
+
+
+def import_archive_log(session: Session, batch_size: Optional[int] = None) -> int:
+    batch_size = batch_size or get_settings().archive_segment_batch_size
+    segment_dir = get_segment_dir()
+    statement = (
+        insert(models.ArchiveLog)
+        .on_conflict_do_nothing(index_elements=[models.ArchiveLog.id])
+        .returning(models.ArchiveLog.id)
+    )
+    restored = 0
+    try:
+        for segment in load_segment_manifest()["segments"]:
+            segment_file = segment_dir / segment["name"]
+            if file_checksum(segment_file) != segment["sha256"]:
+                raise ValueError(f"Checksum mismatch for {segment['name']}")
+            batch: list[dict[str, Any]] = []
+            for item in _read_segment(segment_file):
+                batch.append({**item, "txid": None})
+                if len(batch) >= batch_size:
+                    restored += len(session.execute(statement, batch).all())
+                    batch = []
+            if batch:
+                restored += len(session.execute(statement, batch).all())
+        session.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence('archive_log', 'id'), "
+                "coalesce(max(id), 0) + 1, false) FROM archive_log"
+            )
+        )
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    return restored
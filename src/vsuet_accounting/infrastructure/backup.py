@@ -1,63 +1,528 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
 import os
+import re
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import IO, BinaryIO, Iterable, Iterator, Optional, Sequence
 
 from vsuet_accounting.config import get_settings
 
+BACKUP_FORMATS = ("plain", "custom", "directory")
+BACKUP_SUFFIXES = {"plain": ".sql", "custom": ".dump", "directory": ""}
+CUSTOM_DUMP_MAGIC = b"PGDMP"
+CATALOG_FILE = "catalog.json"
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+UPLOAD_DIR = "uploads"
+PLAIN_HEADER_BYTES = 4096
+PLAIN_DUMP_MARKER = b"PostgreSQL database dump"
+RESTORE_ITEM_PATTERN = re.compile(r"pg_restore: (creating|processing data for table)")
+RESTORE_PARALLEL_ITEM_PATTERN = re.compile(r"pg_restore: finished item")
 
-def backup_database(backup_path: str) -> Path:
+_catalog_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class BackupResult:
+    path: Path
+    format: str
+    size_bytes: int
+    duration_seconds: float
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    name: str
+    format: str
+    created_at: datetime
+    size_bytes: int
+    duration_seconds: float
+    sha256: str
+    excluded_table_data: tuple[str, ...] = ()
+
+    @property
+    def path(self) -> Path:
+        return get_backup_dir() / self.name
+
+
+def _pg_env() -> dict[str, str]:
+    env = os.environ.copy()
+    env["PGPASSWORD"] = get_settings().postgres_password
+    return env
+
+
+def _connection_args() -> list[str]:
     settings = get_settings()
+    return [
+        "-h",
+        settings.postgres_host,
+        "-p",
+        str(settings.postgres_port),
+        "-U",
+        settings.postgres_user,
+    ]
+
+
+def get_backup_dir() -> Path:
+    backup_dir = Path(get_settings().backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    return backup_dir
+
+
+def backup_file_name(prefix: str, fmt: str) -> str:
+    return f"{prefix}{BACKUP_SUFFIXES[fmt]}"
+
+
+def backup_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+    return path.stat().st_size
+
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    if path.is_dir():
+        files = sorted(item for item in path.rglob("*") if item.is_file())
+    else:
+        files = [path]
+    for item in files:
+        if path.is_dir():
+            digest.update(item.relative_to(path).as_posix().encode())
+        with item.open("rb") as handle:
+            while chunk := handle.read(CHECKSUM_CHUNK_SIZE):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def detect_backup_format(path: Path) -> str:
+    if path.is_dir():
+        if not (path / "toc.dat").exists():
+            raise ValueError(f"{path} is not a pg_dump directory archive")
+        return "directory"
+    with path.open("rb") as handle:
+        header = handle.read(len(CUSTOM_DUMP_MAGIC))
+    return "custom" if header == CUSTOM_DUMP_MAGIC else "plain"
+
+
+def create_backup(
+    backup_path: str,
+    fmt: Optional[str] = None,
+    jobs: Optional[int] = None,
+    compress: Optional[int] = None,
+    tables: Sequence[str] = (),
+    exclude_table_data: Optional[Sequence[str]] = None,
+) -> BackupResult:
+    settings = get_settings()
+    fmt = fmt or settings.backup_format
+    if fmt not in BACKUP_FORMATS:
+        raise ValueError(f"Unsupported backup format: {fmt!r}")
+    jobs = jobs or settings.backup_jobs
+    compress = settings.backup_compress if compress is None else compress
+    if exclude_table_data is None:
+        exclude_table_data = settings.backup_exclude_table_data
+
     backup_file = Path(backup_path)
     backup_file.parent.mkdir(parents=True, exist_ok=True)
 
-    env = os.environ.copy()
-    env["PGPASSWORD"] = settings.postgres_password
-
-    subprocess.run(
-        [
-            "pg_dump",
-            "-h",
-            settings.postgres_host,
-            "-p",
-            str(settings.postgres_port),
-            "-U",
-            settings.postgres_user,
-            "--clean",
-            "--if-exists",
-            "-f",
-            str(backup_file),
-            settings.postgres_db,
-        ],
+    command = ["pg_dump", *_connection_args()]
+    if fmt == "plain":
+        command += ["--clean", "--if-exists"]
+    elif fmt == "custom":
+        command += ["--format=custom", f"--compress={compress}"]
+    else:
+        command += ["--format=directory", f"--compress={compress}", f"--jobs={jobs}"]
+    for table in tables:
+        command += ["--table", table]
+    for table in exclude_table_data:
+        command += ["--exclude-table-data", table]
+    command += ["-f", str(backup_file), settings.postgres_db]
+
+    started = time.monotonic()
+    try:
+        subprocess.run(command, check=True, env=_pg_env())
+    except BaseException:
+        if backup_file.is_dir():
+            shutil.rmtree(backup_file, ignore_errors=True)
+        else:
+            backup_file.unlink(missing_ok=True)
+        raise
+
+    return BackupResult(
+        path=backup_file,
+        format=fmt,
+        size_bytes=backup_size(backup_file),
+        duration_seconds=time.monotonic() - started,
+    )
+
+
+def backup_database(backup_path: str) -> Path:
+    return create_backup(backup_path, fmt="plain", exclude_table_data=()).path
+
+
+@dataclass(frozen=True)
+class RestoreProgress:
+    done: int
+    total: int
+    message: str
+
+    @property
+    def fraction(self) -> float:
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+
+def save_upload(stream: BinaryIO, file_name: str) -> tuple[Path, str, int]:
+    upload_dir = get_backup_dir() / UPLOAD_DIR
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    target = upload_dir / Path(file_name).name
+    temp_file = target.with_name(f"{target.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with temp_file.open("wb") as handle:
+            while chunk := stream.read(CHECKSUM_CHUNK_SIZE):
+                digest.update(chunk)
+                handle.write(chunk)
+                size += len(chunk)
+        temp_file.replace(target)
+    except BaseException:
+        temp_file.unlink(missing_ok=True)
+        raise
+    return target, digest.hexdigest(), size
+
+
+def _archive_items(backup_file: Path) -> int:
+    result = subprocess.run(
+        ["pg_restore", "--list", str(backup_file)],
         check=True,
-        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return sum(
+        1 for line in result.stdout.splitlines() if line and not line.startswith(";")
     )
 
-    return backup_file
 
+def verify_backup(backup_path: str, expected_sha256: Optional[str] = None) -> str:
+    backup_file = Path(backup_path)
+    if not backup_file.exists():
+        raise FileNotFoundError(backup_file)
+    if expected_sha256 and file_checksum(backup_file) != expected_sha256:
+        raise ValueError(f"{backup_file.name}: checksum does not match the catalog")
+
+    fmt = detect_backup_format(backup_file)
+    if fmt == "plain":
+        with backup_file.open("rb") as handle:
+            head = handle.read(PLAIN_HEADER_BYTES)
+        try:
+            head.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            if exc.start < len(head) - 4:
+                raise ValueError(f"{backup_file.name}: not a text SQL dump") from exc
+        if PLAIN_DUMP_MARKER not in head:
+            raise ValueError(f"{backup_file.name}: no pg_dump header found")
+    else:
+        try:
+            _archive_items(backup_file)
+        except subprocess.CalledProcessError as exc:
+            raise ValueError(
+                f"{backup_file.name}: damaged archive: {exc.stderr.strip()}"
+            ) from exc
+    return fmt
 
-def restore_database(backup_path: str) -> None:
+
+def _stderr_tail(handle: IO[str]) -> str:
+    handle.seek(0)
+    return "".join(handle.readlines()[-20:])
+
+
+def _restore_plain(backup_file: Path) -> Iterator[RestoreProgress]:
+    settings = get_settings()
+    command = ["psql", *_connection_args(), "-d", settings.postgres_db, "-q", "-f", "-"]
+    total = backup_file.stat().st_size
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as errors:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=errors,
+            env=_pg_env(),
+        )
+        done = 0
+        try:
+            with backup_file.open("rb") as handle:
+                while chunk := handle.read(CHECKSUM_CHUNK_SIZE):
+                    process.stdin.write(chunk)
+                    done += len(chunk)
+                    yield RestoreProgress(done, total, f"{done // (1024 * 1024)} МБ")
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            returncode = process.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(
+                returncode, command, stderr=_stderr_tail(errors)
+            )
+
+
+def _restore_archive(backup_file: Path, jobs: int) -> Iterator[RestoreProgress]:
     settings = get_settings()
+    command = [
+        "pg_restore",
+        *_connection_args(),
+        "-d",
+        settings.postgres_db,
+        "--clean",
+        "--if-exists",
+        "--verbose",
+        f"--jobs={jobs}",
+        str(backup_file),
+    ]
+    total = _archive_items(backup_file)
+    pattern = RESTORE_PARALLEL_ITEM_PATTERN if jobs > 1 else RESTORE_ITEM_PATTERN
+    tail: deque[str] = deque(maxlen=20)
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=_pg_env(),
+    )
+    done = 0
+    try:
+        for line in process.stderr:
+            line = line.rstrip()
+            tail.append(line)
+            if pattern.search(line):
+                done += 1
+                yield RestoreProgress(min(done, total), total, line)
+    finally:
+        returncode = process.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, command, stderr="\n".join(tail))
+
+
+def restore_backup_progress(
+    backup_path: str, jobs: Optional[int] = None
+) -> Iterator[RestoreProgress]:
     backup_file = Path(backup_path)
+    if detect_backup_format(backup_file) == "plain":
+        yield from _restore_plain(backup_file)
+    else:
+        yield from _restore_archive(backup_file, jobs or get_settings().backup_jobs)
 
-    env = os.environ.copy()
-    env["PGPASSWORD"] = settings.postgres_password
-
-    subprocess.run(
-        [
-            "psql",
-            "-h",
-            settings.postgres_host,
-            "-p",
-            str(settings.postgres_port),
-            "-U",
-            settings.postgres_user,
-            "-d",
-            settings.postgres_db,
-            "-f",
-            str(backup_file),
-        ],
-        check=True,
-        env=env,
+
+def restore_backup(backup_path: str, jobs: Optional[int] = None) -> float:
+    started = time.monotonic()
+    for _ in restore_backup_progress(backup_path, jobs):
+        pass
+    return time.monotonic() - started
+
+
+def restore_database(backup_path: str) -> None:
+    restore_backup(backup_path)
+
+
+def _entry_from_json(data: dict) -> CatalogEntry:
+    return CatalogEntry(
+        name=data["name"],
+        format=data["format"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        size_bytes=data["size_bytes"],
+        duration_seconds=data["duration_seconds"],
+        sha256=data["sha256"],
+        excluded_table_data=tuple(data.get("excluded_table_data", ())),
     )
+
+
+def _entry_to_json(entry: CatalogEntry) -> dict:
+    data = asdict(entry)
+    data["created_at"] = entry.created_at.isoformat()
+    data["excluded_table_data"] = list(entry.excluded_table_data)
+    return data
+
+
+def _read_catalog() -> list[CatalogEntry]:
+    catalog_file = get_backup_dir() / CATALOG_FILE
+    if not catalog_file.exists():
+        return []
+    return [_entry_from_json(item) for item in json.loads(catalog_file.read_text())]
+
+
+def _write_catalog(entries: Iterable[CatalogEntry]) -> None:
+    catalog_file = get_backup_dir() / CATALOG_FILE
+    temp_file = catalog_file.with_suffix(".tmp")
+    temp_file.write_text(
+        json.dumps([_entry_to_json(entry) for entry in entries], indent=2, ensure_ascii=False)
+    )
+    temp_file.replace(catalog_file)
+
+
+def load_catalog() -> list[CatalogEntry]:
+    with _catalog_lock:
+        entries = _read_catalog()
+    return sorted(
+        (entry for entry in entries if entry.path.exists()),
+        key=lambda entry: entry.created_at,
+        reverse=True,
+    )
+
+
+def record_backup(
+    result: BackupResult,
+    created_at: datetime,
+    excluded_table_data: Sequence[str] = (),
+) -> CatalogEntry:
+    entry = CatalogEntry(
+        name=result.path.relative_to(get_backup_dir()).as_posix(),
+        format=result.format,
+        created_at=created_at,
+        size_bytes=result.size_bytes,
+        duration_seconds=result.duration_seconds,
+        sha256=file_checksum(result.path),
+        excluded_table_data=tuple(excluded_table_data),
+    )
+    with _catalog_lock:
+        entries = [item for item in _read_catalog() if item.name != entry.name]
+        _write_catalog([*entries, entry])
+    return entry
+
+
+def run_backup(
+    fmt: Optional[str] = None,
+    jobs: Optional[int] = None,
+    compress: Optional[int] = None,
+    tables: Sequence[str] = (),
+    exclude_table_data: Optional[Sequence[str]] = None,
+) -> CatalogEntry:
+    settings = get_settings()
+    fmt = fmt or settings.backup_format
+    if exclude_table_data is None:
+        exclude_table_data = settings.backup_exclude_table_data
+    if "archive_log" in exclude_table_data:
+        from vsuet_accounting.infrastructure.archive_export import export_archive_log
+        from vsuet_accounting.infrastructure.db.session import SessionLocal
+
+        with SessionLocal() as session:
+            export_archive_log(session)
+    created_at = datetime.now()
+    backup_path = get_backup_dir() / backup_file_name(
+        f"backup_{created_at:%Y%m%d_%H%M%S}", fmt
+    )
+    result = create_backup(
+        str(backup_path), fmt, jobs, compress, tables, exclude_table_data
+    )
+    return record_backup(result, created_at, exclude_table_data)
+
+
+def select_retained(
+    entries: Sequence[CatalogEntry], daily: int, weekly: int, monthly: int
+) -> set[str]:
+    newest_first = sorted(entries, key=lambda entry: entry.created_at, reverse=True)
+    buckets = (
+        (daily, lambda moment: moment.date()),
+        (weekly, lambda moment: moment.isocalendar()[:2]),
+        (monthly, lambda moment: (moment.year, moment.month)),
+    )
+    keep = {newest_first[0].name} if newest_first else set()
+    for count, bucket in buckets:
+        seen: set = set()
+        for entry in newest_first:
+            key = bucket(entry.created_at)
+            if key in seen:
+                continue
+            if len(seen) >= count:
+                break
+            seen.add(key)
+            keep.add(entry.name)
+    return keep
+
+
+def apply_retention(
+    daily: Optional[int] = None,
+    weekly: Optional[int] = None,
+    monthly: Optional[int] = None,
+) -> list[CatalogEntry]:
+    settings = get_settings()
+    daily = settings.backup_keep_daily if daily is None else daily
+    weekly = settings.backup_keep_weekly if weekly is None else weekly
+    monthly = settings.backup_keep_monthly if monthly is None else monthly
+    if not daily and not weekly and not monthly:
+        return []
+
+    with _catalog_lock:
+        entries = [entry for entry in _read_catalog() if entry.path.exists()]
+        keep = select_retained(entries, daily, weekly, monthly)
+        removed = [entry for entry in entries if entry.name not in keep]
+        for entry in removed:
+            if entry.path.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                entry.path.unlink(missing_ok=True)
+        _write_catalog(entry for entry in entries if entry.name in keep)
+    return removed
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Create a cataloged backup and apply the retention policy."
+    )
+    parser.add_argument("--format", choices=BACKUP_FORMATS)
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--compress", type=int)
+    parser.add_argument("--exclude-table-data", action="append")
+    parser.add_argument(
+        "--export-archive-log",
+        action="store_true",
+        help="append new archive_log rows to compressed segments before the dump",
+    )
+    parser.add_argument(
+        "--import-archive-log",
+        action="store_true",
+        help="load archive_log rows from the exported segments and exit",
+    )
+    args = parser.parse_args(argv)
+
+    if args.import_archive_log:
+        from vsuet_accounting.infrastructure.archive_export import import_archive_log
+        from vsuet_accounting.infrastructure.db.session import SessionLocal
+
+        with SessionLocal() as session:
+            restored = import_archive_log(session)
+        print(f"archive_log rows restored: {restored}")
+        return 0
+
+    if args.export_archive_log:
+        from vsuet_accounting.infrastructure.archive_export import export_archive_log
+        from vsuet_accounting.infrastructure.db.session import SessionLocal
+
+        with SessionLocal() as session:
+            segment = export_archive_log(session)
+        print(f"archive_log rows exported: {segment['rows'] if segment else 0}")
+
+    entry = run_backup(args.format, args.jobs, args.compress, (), args.exclude_table_data)
+    print(
+        f"Backup: {entry.path} ({entry.size_bytes} bytes, "
+        f"{entry.duration_seconds:.1f} s, sha256 {entry.sha256})"
+    )
+    for removed in apply_retention():
+        print(f"Removed by retention: {removed.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,12 +5,8 @@ import time
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
-from vsuet_accounting.infrastructure.db.init_db import (
-    database_is_empty,
-    init_db,
-    seed_data,
-)
-from vsuet_accounting.infrastructure.db.session import SessionLocal, get_engine
+from vsuet_accounting.infrastructure.db.init_db import init_db
+from vsuet_accounting.infrastructure.db.session import get_engine
 
 
 def wait_for_db(retries: int = 30, delay: float = 1.0) -> None:
@@ -29,11 +25,7 @@ def wait_for_db(retries: int = 30, delay: float = 1.0) -> None:
 def bootstrap() -> None:
     engine = get_engine()
     wait_for_db()
-    init_db(engine, seed=False)
-
-    with SessionLocal() as session:
-        if database_is_empty(session):
-            seed_data(session)
+    init_db(engine, seed=True)
 
 
 if __name__ == "__main__":
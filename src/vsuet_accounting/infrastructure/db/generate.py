@@ -0,0 +1,537 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from vsuet_accounting.config import get_settings
+from vsuet_accounting.infrastructure.db.init_db import database_is_empty
+from vsuet_accounting.infrastructure.db.partitioning import (
+    PARTITION_KEYS,
+    is_partitioned,
+)
+
+COPY_CHUNK_ROWS = 250_000
+PAYROLL_NET_RATIO = 0.87
+
+GENERATED_TABLES = (
+    "archive_log",
+    "payrolls_archive",
+    "payrolls",
+    "expenses",
+    "employees",
+    "vendors",
+    "departments",
+    "expense_monthly_rollup",
+    "payroll_monthly_rollup",
+)
+
+DEPARTMENTS = (
+    ("Бухгалтерия", "БУХ"),
+    ("Планово-финансовый отдел", "ПФО"),
+    ("Отдел закупок и снабжения", "ОЗС"),
+    ("ИТ-служба", "ИТ"),
+    ("Кафедра пищевых технологий", "КПТ"),
+    ("Отдел кадров", "ОК"),
+    ("Юридический отдел", "ЮО"),
+    ("Административно-хозяйственная часть", "АХЧ"),
+    ("Научно-исследовательская часть", "НИЧ"),
+    ("Библиотека", "БИБ"),
+)
+
+FACULTY_SUBJECTS = (
+    "технологии хлебопекарного производства",
+    "технологии жиров и бродильных производств",
+    "машин и аппаратов пищевых производств",
+    "физической и коллоидной химии",
+    "высшей математики",
+    "информационных технологий",
+    "экономики и управления",
+    "иностранных языков",
+    "промышленной экологии",
+    "биохимии и биотехнологии",
+    "холодильной техники",
+    "сервиса и ресторанного бизнеса",
+)
+
+SURNAMES = (
+    "Петров", "Сидоров", "Смирнов", "Лебедев", "Волков", "Иванов", "Кузнецов",
+    "Попов", "Соколов", "Морозов", "Новиков", "Федоров", "Козлов", "Орлов",
+    "Егоров", "Павлов", "Семенов", "Голубев", "Виноградов", "Богданов",
+    "Воробьев", "Васильев", "Зайцев", "Соловьев", "Борисов", "Яковлев",
+    "Григорьев", "Романов", "Комаров", "Беляев",
+)
+
+MALE_NAMES = (
+    "Иван", "Сергей", "Дмитрий", "Павел", "Алексей", "Андрей", "Николай",
+    "Михаил", "Владимир", "Олег", "Артем", "Игорь", "Евгений", "Юрий",
+)
+
+FEMALE_NAMES = (
+    "Елена", "Ольга", "Марина", "Наталья", "Татьяна", "Ирина", "Анна",
+    "Светлана", "Екатерина", "Юлия", "Мария", "Людмила", "Галина", "Вера",
+)
+
+PATRONYMICS = (
+    ("Сергеевич", "Сергеевна"),
+    ("Викторович", "Викторовна"),
+    ("Павлович", "Павловна"),
+    ("Андреевич", "Андреевна"),
+    ("Алексеевич", "Алексеевна"),
+    ("Николаевич", "Николаевна"),
+    ("Олегович", "Олеговна"),
+    ("Иванович", "Ивановна"),
+    ("Дмитриевич", "Дмитриевна"),
+    ("Владимирович", "Владимировна"),
+    ("Михайлович", "Михайловна"),
+    ("Петрович", "Петровна"),
+)
+
+VENDOR_FORMS = ("ООО", "ООО", "ООО", "АО", "ИП")
+VENDOR_ROOTS = (
+    "ВГУИТ", "Тех", "Офис", "Энерго", "ЛабХим", "Агро", "Пищ", "Строй",
+    "Вектор", "Альфа", "Черноземье", "Дон", "Меридиан", "Лига", "Гарант",
+)
+VENDOR_SUFFIXES = (
+    "Снабжение", "Сервис", "Трейд", "Лайн", "Маркет", "Групп", "Комплект",
+    "Поставка", "Проект", "Системы",
+)
+
+
+@dataclass(frozen=True)
+class GeneratorParams:
+    departments: int = 20
+    employees: int = 2_000
+    vendors: int = 300
+    years: int = 5
+    expenses_per_month: int = 20_000
+    archive_ratio: float = 0.3
+    seed: int = 42
+    end_date: date = date(2025, 12, 31)
+
+    @property
+    def start_date(self) -> date:
+        return date(self.end_date.year - self.years + 1, 1, 1)
+
+
+def _months(params: GeneratorParams) -> np.ndarray:
+    return np.arange(
+        np.datetime64(params.start_date, "M"),
+        np.datetime64(params.end_date, "M") + 1,
+    )
+
+
+def _escape(value: Any) -> str:
+    if value is None or pd.isna(value):
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+    )
+
+
+def _encode(values: np.ndarray) -> list[str]:
+    if values.dtype.kind == "M" and np.isnat(values).any():
+        missing = np.isnat(values)
+        encoded = np.full(len(values), "\\N", dtype=object)
+        encoded[~missing] = _encode(values[~missing])
+        return encoded.tolist()
+    if values.dtype == np.bool_:
+        return np.where(values, "t", "f").tolist()
+    if values.dtype.kind == "f":
+        return list(map("{:.2f}".format, values.tolist()))
+    if values.dtype.kind in "iuM":
+        unique, inverse = np.unique(values, return_inverse=True)
+        if values.dtype.kind == "M":
+            days = unique.astype("datetime64[D]")
+            if (days == unique).all():
+                labels = np.datetime_as_string(days, unit="D").tolist()
+            else:
+                labels = [
+                    label.replace("T", " ")
+                    for label in np.datetime_as_string(unique, unit="s").tolist()
+                ]
+        else:
+            labels = [str(value) for value in unique.tolist()]
+        return np.asarray(labels, dtype=object)[inverse].tolist()
+    return [_escape(value) for value in values.tolist()]
+
+
+def copy_text(frame: pd.DataFrame) -> str:
+    columns = [_encode(frame[name].to_numpy()) for name in frame.columns]
+    return "\n".join(map("\t".join, zip(*columns))) + "\n"
+
+
+def _copy_frame(session: Session, table_name: str, frame: pd.DataFrame) -> int:
+    if frame.empty:
+        return 0
+    buffer = io.StringIO(copy_text(frame))
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(frame.columns)}) FROM STDIN", buffer
+        )
+    finally:
+        cursor.close()
+    return len(frame)
+
+
+def department_frame(params: GeneratorParams) -> pd.DataFrame:
+    rows = list(DEPARTMENTS[: params.departments])
+    for index in range(len(rows), params.departments):
+        subject = FACULTY_SUBJECTS[index % len(FACULTY_SUBJECTS)]
+        round_number = index // len(FACULTY_SUBJECTS)
+        suffix = f" №{round_number + 1}" if round_number else ""
+        rows.append((f"Кафедра {subject}{suffix}", f"КАФ-{index + 1:03d}"))
+    frame = pd.DataFrame(rows, columns=["name", "code"])
+    frame.insert(0, "id", np.arange(1, len(frame) + 1))
+    return frame
+
+
+def vendor_frame(params: GeneratorParams, rng: np.random.Generator) -> pd.DataFrame:
+    forms = rng.choice(VENDOR_FORMS, params.vendors)
+    roots = rng.choice(VENDOR_ROOTS, params.vendors)
+    suffixes = rng.choice(VENDOR_SUFFIXES, params.vendors)
+    names = [
+        f'{form} "{root}-{suffix}"' if index % 3 else f'{form} "{root}{suffix}"'
+        for index, (form, root, suffix) in enumerate(zip(forms, roots, suffixes))
+    ]
+    return pd.DataFrame(
+        {
+            "id": np.arange(1, params.vendors + 1),
+            "name": names,
+            "inn": [f"3661{index:06d}" for index in range(1, params.vendors + 1)],
+        }
+    )
+
+
+def employee_frame(params: GeneratorParams, rng: np.random.Generator) -> pd.DataFrame:
+    count = params.employees
+    female = rng.random(count) < 0.55
+    surnames = rng.choice(SURNAMES, count)
+    male_names = rng.choice(MALE_NAMES, count)
+    female_names = rng.choice(FEMALE_NAMES, count)
+    patronymics = rng.integers(0, len(PATRONYMICS), count)
+    full_names = [
+        f"{surname}а {female_name} {PATRONYMICS[patronymic][1]}"
+        if is_female
+        else f"{surname} {male_name} {PATRONYMICS[patronymic][0]}"
+        for surname, male_name, female_name, patronymic, is_female in zip(
+            surnames, male_names, female_names, patronymics, female
+        )
+    ]
+
+    weights = rng.dirichlet(np.full(params.departments, 1.5))
+    earliest = np.datetime64(params.start_date, "D") - np.timedelta64(10 * 365, "D")
+    span = (np.datetime64(params.end_date, "D") - earliest).astype(int)
+    return pd.DataFrame(
+        {
+            "id": np.arange(1, count + 1),
+            "department_id": rng.choice(params.departments, count, p=weights) + 1,
+            "full_name": full_names,
+            "hire_date": earliest
+            + rng.integers(0, span, count).astype("timedelta64[D]"),
+            "base_salary": np.round(rng.lognormal(np.log(55_000), 0.3, count) / 500)
+            * 500,
+            "is_active": rng.random(count) < 0.92,
+        }
+    )
+
+
+def _expense_month(
+    month: np.datetime64,
+    count: int,
+    params: GeneratorParams,
+    rng: np.random.Generator,
+    department_weights: np.ndarray,
+    vendor_weights: np.ndarray,
+    recent: bool,
+) -> pd.DataFrame:
+    first_day = month.astype("datetime64[D]")
+    days = ((month + 1).astype("datetime64[D]") - first_day).astype(int)
+    return pd.DataFrame(
+        {
+            "department_id": rng.choice(params.departments, count, p=department_weights)
+            + 1,
+            "vendor_id": rng.choice(params.vendors, count, p=vendor_weights) + 1,
+            "amount": np.round(rng.lognormal(np.log(12_000), 1.0, count), 2),
+            "expense_date": first_day
+            + rng.integers(0, days, count).astype("timedelta64[D]"),
+            "is_approved": rng.random(count) < (0.6 if recent else 0.98),
+        }
+    )
+
+
+def load_expenses(
+    session: Session, params: GeneratorParams, rng: np.random.Generator
+) -> int:
+    department_weights = rng.dirichlet(np.full(params.departments, 1.0))
+    vendor_weights = rng.dirichlet(np.full(params.vendors, 0.5))
+    months = _months(params)
+    loaded = 0
+    pending: list[pd.DataFrame] = []
+    pending_rows = 0
+    for index, month in enumerate(months):
+        count = int(params.expenses_per_month * rng.uniform(0.85, 1.15))
+        pending.append(
+            _expense_month(
+                month,
+                count,
+                params,
+                rng,
+                department_weights,
+                vendor_weights,
+                recent=index >= len(months) - 2,
+            )
+        )
+        pending_rows += count
+        if pending_rows >= COPY_CHUNK_ROWS or index == len(months) - 1:
+            frame = pd.concat(pending, ignore_index=True)
+            loaded += _copy_frame(session, "expenses", frame)
+            pending, pending_rows = [], 0
+    return loaded
+
+
+def payroll_frame(
+    params: GeneratorParams, employees: pd.DataFrame, rng: np.random.Generator
+) -> pd.DataFrame:
+    months = _months(params)
+    hire_months = employees["hire_date"].to_numpy().astype("datetime64[M]")
+    leave_months = np.where(
+        employees["is_active"].to_numpy(),
+        months[-1],
+        np.minimum(
+            hire_months + rng.integers(6, 120, len(employees)).astype("timedelta64[M]"),
+            months[-1],
+        ),
+    )
+    employed = (months[None, :] >= hire_months[:, None]) & (
+        months[None, :] <= leave_months[:, None]
+    )
+    employee_index, month_index = np.nonzero(employed)
+    count = len(employee_index)
+
+    period_start = months[month_index].astype("datetime64[D]")
+    period_end = (months[month_index] + 1).astype("datetime64[D]") - np.timedelta64(
+        1, "D"
+    )
+    salary = employees["base_salary"].to_numpy()[employee_index]
+    unpaid = (month_index == len(months) - 1) & (rng.random(count) < 0.3)
+    paid_at = (
+        period_end.astype("datetime64[s]")
+        + rng.integers(5, 13, count).astype("timedelta64[D]")
+        + np.timedelta64(10, "h")
+    ).astype(object)
+    paid_at[unpaid] = None
+
+    frame = pd.DataFrame(
+        {
+            "employee_id": employee_index + 1,
+            "period_start": period_start,
+            "period_end": period_end,
+            "net_amount": np.round(
+                salary * PAYROLL_NET_RATIO * rng.uniform(0.95, 1.1, count), 2
+            ),
+            "paid_at": paid_at,
+            "is_paid": ~unpaid,
+        }
+    )
+    frame = frame.sort_values(["period_end", "employee_id"], ignore_index=True)
+    frame.insert(0, "id", np.arange(1, count + 1))
+    return frame
+
+
+def _archive_log_frame(archived: pd.DataFrame) -> pd.DataFrame:
+    columns = [
+        "id",
+        "employee_id",
+        "period_start",
+        "period_end",
+        "net_amount",
+        "paid_at",
+        "is_paid",
+    ]
+    payloads = [
+        json.dumps(
+            {
+                "id": int(row.id),
+                "employee_id": int(row.employee_id),
+                "period_start": str(row.period_start.date()),
+                "period_end": str(row.period_end.date()),
+                "net_amount": float(row.net_amount),
+                "paid_at": row.paid_at.isoformat() if pd.notna(row.paid_at) else None,
+                "is_paid": bool(row.is_paid),
+            },
+            ensure_ascii=False,
+        )
+        for row in archived[columns].itertuples(index=False)
+    ]
+    return pd.DataFrame(
+        {
+            "source_table": "payrolls",
+            "archived_at": archived["archived_at"].to_numpy(),
+            "payload": payloads,
+        }
+    )
+
+
+def load_payrolls(
+    session: Session,
+    params: GeneratorParams,
+    employees: pd.DataFrame,
+    rng: np.random.Generator,
+) -> tuple[int, int, int]:
+    payrolls = payroll_frame(params, employees, rng)
+    archived_count = int(len(payrolls) * params.archive_ratio)
+    archived = payrolls.iloc[:archived_count].assign(
+        archived_at=lambda data: (data["period_end"] + pd.Timedelta(days=400)).clip(
+            upper=pd.Timestamp(params.end_date)
+        )
+    )
+    current = payrolls.iloc[archived_count:]
+
+    loaded = 0
+    for start in range(0, len(current), COPY_CHUNK_ROWS):
+        chunk = current.iloc[start : start + COPY_CHUNK_ROWS]
+        loaded += _copy_frame(session, "payrolls", chunk)
+    archived_loaded = 0
+    log_loaded = 0
+    for start in range(0, len(archived), COPY_CHUNK_ROWS):
+        chunk = archived.iloc[start : start + COPY_CHUNK_ROWS]
+        archived_loaded += _copy_frame(session, "payrolls_archive", chunk)
+        log_loaded += _copy_frame(session, "archive_log", _archive_log_frame(chunk))
+    _sync_identity(session, "payrolls", len(payrolls))
+    return loaded, archived_loaded, log_loaded
+
+
+def _sync_identity(session: Session, table_name: str, value: int) -> None:
+    session.execute(
+        text("SELECT setval(pg_get_serial_sequence(:table_name, 'id'), :value, :called)"),
+        {"table_name": table_name, "value": max(value, 1), "called": value > 0},
+    )
+
+
+def _prepare_partitions(session: Session, params: GeneratorParams) -> None:
+    step = get_settings().partitioning
+    if step == "none":
+        return
+    connection = session.connection()
+    for model, key_column in PARTITION_KEYS.items():
+        if is_partitioned(connection, model.__tablename__):
+            session.execute(
+                text(
+                    "SELECT ensure_range_partitions("
+                    ":table_name, :key_column, :step, :from_date, :to_date)"
+                ),
+                {
+                    "table_name": model.__tablename__,
+                    "key_column": key_column,
+                    "step": step,
+                    "from_date": params.start_date,
+                    "to_date": params.end_date,
+                },
+            )
+
+
+def generate_dataset(
+    session: Session, params: GeneratorParams, truncate: bool = False
+) -> dict[str, Any]:
+    started = time.monotonic()
+    rng = np.random.default_rng(params.seed)
+    try:
+        if truncate:
+            session.execute(
+                text(f"TRUNCATE {', '.join(GENERATED_TABLES)} RESTART IDENTITY CASCADE")
+            )
+        elif not database_is_empty(session):
+            raise ValueError("Database is not empty; pass truncate=True to replace it.")
+        _prepare_partitions(session, params)
+
+        departments = _copy_frame(session, "departments", department_frame(params))
+        vendors = _copy_frame(session, "vendors", vendor_frame(params, rng))
+        employee_rows = employee_frame(params, rng)
+        employees = _copy_frame(session, "employees", employee_rows)
+        _sync_identity(session, "departments", departments)
+        _sync_identity(session, "vendors", vendors)
+        _sync_identity(session, "employees", employees)
+        expenses = load_expenses(session, params, rng)
+        payrolls, archived, archive_log = load_payrolls(
+            session, params, employee_rows, rng
+        )
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+
+    for table_name in GENERATED_TABLES:
+        session.execute(text(f"ANALYZE {table_name}"))
+    session.commit()
+
+    return {
+        "departments": departments,
+        "vendors": vendors,
+        "employees": employees,
+        "expenses": expenses,
+        "payrolls": payrolls,
+        "payrolls_archive": archived,
+        "archive_log": archive_log,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from vsuet_accounting.application.cache import clear_caches
+    from vsuet_accounting.infrastructure.db.session import SessionLocal
+
+    defaults = GeneratorParams()
+    parser = argparse.ArgumentParser(
+        description="Load a deterministic synthetic dataset through COPY."
+    )
+    parser.add_argument("--departments", type=int, default=defaults.departments)
+    parser.add_argument("--employees", type=int, default=defaults.employees)
+    parser.add_argument("--vendors", type=int, default=defaults.vendors)
+    parser.add_argument("--years", type=int, default=defaults.years)
+    parser.add_argument(
+        "--expenses-per-month", type=int, default=defaults.expenses_per_month
+    )
+    parser.add_argument("--archive-ratio", type=float, default=defaults.archive_ratio)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--end-date", type=date.fromisoformat, default=defaults.end_date
+    )
+    parser.add_argument(
+        "--truncate", action="store_true", help="replace existing data"
+    )
+    args = parser.parse_args(argv)
+
+    params = GeneratorParams(
+        departments=args.departments,
+        employees=args.employees,
+        vendors=args.vendors,
+        years=args.years,
+        expenses_per_month=args.expenses_per_month,
+        archive_ratio=args.archive_ratio,
+        seed=args.seed,
+        end_date=args.end_date,
+    )
+    with SessionLocal() as session:
+        result = generate_dataset(session, params, truncate=args.truncate)
+    clear_caches()
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
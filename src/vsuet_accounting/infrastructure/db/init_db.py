@@ -1,11 +1,21 @@
-    from __future__ import annotations
+from __future__ import annotations
 
+import hashlib
+from contextlib import contextmanager
 from datetime import date, datetime
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, Optional
 
-from sqlalchemy import func, select, text
+from sqlalchemy import and_, exists, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
 
+from vsuet_accounting.config import get_settings
+from vsuet_accounting.infrastructure.db.migrations import (
+    apply_migrations,
+    latest_version,
+)
 from vsuet_accounting.infrastructure.db.models import (
     ArchiveLog,
     Base,
@@ -13,23 +23,78 @@ from vsuet_accounting.infrastructure.db.models import (
     Employee,
     Expense,
     Payroll,
+    PayrollArchive,
     Vendor,
 )
+from vsuet_accounting.infrastructure.db.partitioning import (
+    PARTITION_FUNCTIONS_SQL,
+    PARTITION_KEYS,
+    ensure_future_partitions,
+    partition_table,
+)
 from vsuet_accounting.infrastructure.db.session import SessionLocal
 
+BOOTSTRAP_LOCK_KEY = 7_301_002
+
 ARCHIVE_FUNCTION_SQL = """
 CREATE OR REPLACE FUNCTION archive_payrolls(cutoff_date date)
 RETURNS integer AS $$
 DECLARE
     moved_count integer;
+    partition_count integer;
 BEGIN
-    INSERT INTO archive_log (source_table, payload)
-    SELECT 'payrolls', to_jsonb(p) FROM payrolls p
-    WHERE p.period_end < cutoff_date;
+    moved_count := 0;
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'payrolls'::regclass
+    ) THEN
+        LOOP
+            partition_count := archive_payroll_partition(cutoff_date);
+            EXIT WHEN partition_count IS NULL;
+            moved_count := moved_count + partition_count;
+        END LOOP;
+    END IF;
 
-    GET DIAGNOSTICS moved_count = ROW_COUNT;
+    WITH moved AS (
+        DELETE FROM payrolls WHERE period_end < cutoff_date
+        RETURNING id, employee_id, period_start, period_end, net_amount, paid_at, is_paid
+    )
+    INSERT INTO payrolls_archive
+        (id, employee_id, period_start, period_end, net_amount, paid_at, is_paid)
+    SELECT id, employee_id, period_start, period_end, net_amount, paid_at, is_paid
+    FROM moved;
+
+    GET DIAGNOSTICS partition_count = ROW_COUNT;
 
-    DELETE FROM payrolls WHERE period_end < cutoff_date;
+    RETURN moved_count + partition_count;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ARCHIVE_BATCH_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION archive_payrolls_batch(cutoff_date date, batch_size integer)
+RETURNS integer AS $$
+DECLARE
+    moved_count integer;
+BEGIN
+    WITH batch AS (
+        SELECT id FROM payrolls
+        WHERE period_end < cutoff_date
+        ORDER BY period_end, id
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    ), moved AS (
+        DELETE FROM payrolls p
+        USING batch b
+        WHERE p.id = b.id
+        RETURNING p.id, p.employee_id, p.period_start, p.period_end,
+                  p.net_amount, p.paid_at, p.is_paid
+    )
+    INSERT INTO payrolls_archive
+        (id, employee_id, period_start, period_end, net_amount, paid_at, is_paid)
+    SELECT id, employee_id, period_start, period_end, net_amount, paid_at, is_paid
+    FROM moved;
+
+    GET DIAGNOSTICS moved_count = ROW_COUNT;
 
     RETURN moved_count;
 END;
@@ -39,16 +104,15 @@ $$ LANGUAGE plpgsql;
 ARCHIVE_VIEW_SQL = """
 CREATE OR REPLACE VIEW payrolls_archive_view AS
 SELECT
-    (payload->>'id')::int AS id,
-    (payload->>'employee_id')::int AS employee_id,
-    (payload->>'period_start')::date AS period_start,
-    (payload->>'period_end')::date AS period_end,
-    (payload->>'net_amount')::numeric AS net_amount,
-    (payload->>'paid_at')::timestamp AS paid_at,
-    (payload->>'is_paid')::boolean AS is_paid,
-    archived_at AS archived_at
-FROM archive_log
-WHERE source_table = 'payrolls';
+    id,
+    employee_id,
+    period_start,
+    period_end,
+    net_amount::numeric AS net_amount,
+    paid_at,
+    is_paid,
+    archived_at
+FROM payrolls_archive;
 """
 
 PAYROLLS_ALL_VIEW_SQL = """
@@ -69,23 +133,313 @@ SELECT
     employee_id,
     period_start,
     period_end,
-    net_amount,
+    net_amount::numeric,
     paid_at,
     is_paid,
     archived_at
-FROM payrolls_archive_view;
+FROM payrolls_archive;
 """
 
+EXPENSE_ROLLUP_SQL = """
+CREATE OR REPLACE FUNCTION expense_rollup_apply()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE expense_monthly_rollup r
+        SET total_amount = r.total_amount - o.total_amount,
+            row_count = r.row_count - o.row_count
+        FROM (
+            SELECT department_id, vendor_id,
+                   date_trunc('month', expense_date)::date AS month, is_approved,
+                   sum(amount) AS total_amount, count(*) AS row_count
+            FROM old_rows
+            GROUP BY 1, 2, 3, 4
+        ) o
+        WHERE r.department_id = o.department_id
+          AND r.vendor_id = o.vendor_id
+          AND r.month = o.month
+          AND r.is_approved = o.is_approved;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO expense_monthly_rollup AS r
+            (department_id, vendor_id, month, is_approved, total_amount, row_count)
+        SELECT department_id, vendor_id,
+               date_trunc('month', expense_date)::date, is_approved,
+               sum(amount), count(*)
+        FROM new_rows
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (department_id, vendor_id, month, is_approved) DO UPDATE
+        SET total_amount = r.total_amount + EXCLUDED.total_amount,
+            row_count = r.row_count + EXCLUDED.row_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_expense_rollup(since date DEFAULT NULL)
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE expenses IN SHARE MODE;
+
+    DELETE FROM expense_monthly_rollup
+    WHERE since IS NULL OR month >= date_trunc('month', since)::date;
+
+    INSERT INTO expense_monthly_rollup
+        (department_id, vendor_id, month, is_approved, total_amount, row_count)
+    SELECT department_id, vendor_id,
+           date_trunc('month', expense_date)::date, is_approved,
+           sum(amount), count(*)
+    FROM expenses
+    WHERE since IS NULL OR expense_date >= date_trunc('month', since)::date
+    GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS expenses_rollup_insert ON expenses;
+CREATE TRIGGER expenses_rollup_insert
+AFTER INSERT ON expenses
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION expense_rollup_apply();
+
+DROP TRIGGER IF EXISTS expenses_rollup_update ON expenses;
+CREATE TRIGGER expenses_rollup_update
+AFTER UPDATE ON expenses
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION expense_rollup_apply();
+
+DROP TRIGGER IF EXISTS expenses_rollup_delete ON expenses;
+CREATE TRIGGER expenses_rollup_delete
+AFTER DELETE ON expenses
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION expense_rollup_apply();
+"""
+
+PAYROLL_ROLLUP_SQL = """
+CREATE OR REPLACE FUNCTION payroll_rollup_apply()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE payroll_monthly_rollup r
+        SET total_net = r.total_net - o.total_net,
+            row_count = r.row_count - o.row_count
+        FROM (
+            SELECT employee_id, date_trunc('month', period_end)::date AS month,
+                   is_paid, sum(net_amount) AS total_net, count(*) AS row_count
+            FROM old_rows
+            GROUP BY 1, 2, 3
+        ) o
+        WHERE r.employee_id = o.employee_id
+          AND r.month = o.month
+          AND r.is_paid = o.is_paid;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO payroll_monthly_rollup AS r
+            (department_id, employee_id, month, is_paid, total_net, row_count)
+        SELECT e.department_id, n.employee_id,
+               date_trunc('month', n.period_end)::date, n.is_paid,
+               sum(n.net_amount), count(*)
+        FROM new_rows n
+        JOIN employees e ON e.id = n.employee_id
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (department_id, employee_id, month, is_paid) DO UPDATE
+        SET total_net = r.total_net + EXCLUDED.total_net,
+            row_count = r.row_count + EXCLUDED.row_count;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
 
-def init_db(engine, seed: bool = True) -> None:
+CREATE OR REPLACE FUNCTION payroll_rollup_reassign()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE payroll_monthly_rollup r
+    SET department_id = n.department_id
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    WHERE r.employee_id = n.id
+      AND o.department_id <> n.department_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_payroll_rollup(since date DEFAULT NULL)
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE payrolls IN SHARE MODE;
+
+    DELETE FROM payroll_monthly_rollup
+    WHERE since IS NULL OR month >= date_trunc('month', since)::date;
+
+    INSERT INTO payroll_monthly_rollup
+        (department_id, employee_id, month, is_paid, total_net, row_count)
+    SELECT e.department_id, p.employee_id,
+           date_trunc('month', p.period_end)::date, p.is_paid,
+           sum(p.net_amount), count(*)
+    FROM payrolls p
+    JOIN employees e ON e.id = p.employee_id
+    WHERE since IS NULL OR p.period_end >= date_trunc('month', since)::date
+    GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS payrolls_rollup_insert ON payrolls;
+CREATE TRIGGER payrolls_rollup_insert
+AFTER INSERT ON payrolls
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_apply();
+
+DROP TRIGGER IF EXISTS payrolls_rollup_update ON payrolls;
+CREATE TRIGGER payrolls_rollup_update
+AFTER UPDATE ON payrolls
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_apply();
+
+DROP TRIGGER IF EXISTS payrolls_rollup_delete ON payrolls;
+CREATE TRIGGER payrolls_rollup_delete
+AFTER DELETE ON payrolls
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_apply();
+
+DROP TRIGGER IF EXISTS employees_rollup_reassign ON employees;
+CREATE TRIGGER employees_rollup_reassign
+AFTER UPDATE ON employees
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION payroll_rollup_reassign();
+"""
+
+ROLLUP_BACKFILL_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM expense_monthly_rollup)
+       AND EXISTS (SELECT 1 FROM expenses) THEN
+        PERFORM rebuild_expense_rollup();
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM payroll_monthly_rollup)
+       AND EXISTS (SELECT 1 FROM payrolls) THEN
+        PERFORM rebuild_payroll_rollup();
+    END IF;
+END;
+$$;
+"""
+
+
+BOOTSTRAP_DDL = (
+    PARTITION_FUNCTIONS_SQL,
+    ARCHIVE_FUNCTION_SQL,
+    ARCHIVE_BATCH_FUNCTION_SQL,
+    ARCHIVE_VIEW_SQL,
+    PAYROLLS_ALL_VIEW_SQL,
+    EXPENSE_ROLLUP_SQL,
+    PAYROLL_ROLLUP_SQL,
+    ROLLUP_BACKFILL_SQL,
+)
+
+SCHEMA_STATE_SQL = """
+SELECT
+    (SELECT max(version) FROM schema_version) AS version,
+    (SELECT fingerprint FROM schema_fingerprint) AS fingerprint
+"""
+
+RECORD_FINGERPRINT_SQL = """
+INSERT INTO schema_fingerprint (id, fingerprint) VALUES (true, :fingerprint)
+ON CONFLICT (id) DO UPDATE
+SET fingerprint = excluded.fingerprint, updated_at = now()
+"""
+
+
+def init_partitioning(engine, step: str, premake: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        converted = [
+            partition_table(conn, model, step, premake, dependent_views=("payrolls_all",))
+            for model in PARTITION_KEYS
+        ]
+        if any(converted):
+            conn.execute(text(PAYROLLS_ALL_VIEW_SQL))
+            conn.execute(text(EXPENSE_ROLLUP_SQL))
+            conn.execute(text(PAYROLL_ROLLUP_SQL))
+        ensure_future_partitions(conn, step, premake)
+
+
+def schema_fingerprint() -> str:
+    digest = hashlib.sha256()
+    dialect = postgresql.dialect()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+    for statement in BOOTSTRAP_DDL:
+        digest.update(statement.encode())
+    digest.update(f"{latest_version()}:{get_settings().partitioning}".encode())
+    return digest.hexdigest()[:32]
+
+
+def schema_is_current(conn, fingerprint: str) -> bool:
+    if not conn.scalar(
+        text(
+            "SELECT to_regclass('schema_version') IS NOT NULL "
+            "AND to_regclass('schema_fingerprint') IS NOT NULL"
+        )
+    ):
+        return False
+    state = conn.execute(text(SCHEMA_STATE_SQL)).one()
+    return state.version == latest_version() and state.fingerprint == fingerprint
+
+
+def _record_fingerprint(conn, fingerprint: str) -> None:
+    conn.execute(text(RECORD_FINGERPRINT_SQL), {"fingerprint": fingerprint})
+
+
+def _create_schema(engine) -> None:
+    settings = get_settings()
     Base.metadata.create_all(engine)
     with engine.begin() as conn:
-        conn.execute(text(ARCHIVE_FUNCTION_SQL))
-        conn.execute(text(ARCHIVE_VIEW_SQL))
-        conn.execute(text(PAYROLLS_ALL_VIEW_SQL))
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        for statement in BOOTSTRAP_DDL:
+            conn.execute(text(statement))
+    apply_migrations(engine)
+    if settings.partitioning != "none":
+        init_partitioning(engine, settings.partitioning, settings.partition_premake)
+
+
+@contextmanager
+def _bootstrap_lock(engine) -> Iterator[Connection]:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+        try:
+            yield conn
+        finally:
+            conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": BOOTSTRAP_LOCK_KEY}
+            )
+
+
+def init_db(engine, seed: bool = True) -> bool:
+    settings = get_settings()
+    fingerprint = schema_fingerprint()
+    with engine.connect() as conn:
+        current = schema_is_current(conn, fingerprint)
+
+    created = False
+    if not current or seed:
+        with _bootstrap_lock(engine) as conn:
+            if not schema_is_current(conn, fingerprint):
+                _create_schema(engine)
+                _record_fingerprint(conn, fingerprint)
+                created = True
+            if seed:
+                seed_data()
 
-    if seed:
-        seed_data()
+    if not created and settings.partitioning != "none":
+        with engine.begin() as conn:
+            conn.execute(text("SET LOCAL statement_timeout = 0"))
+            ensure_future_partitions(
+                conn, settings.partitioning, settings.partition_premake
+            )
+    return created
 
 
 def database_is_empty(session: Session) -> bool:
@@ -95,10 +449,11 @@ def database_is_empty(session: Session) -> bool:
         Vendor,
         Expense,
         Payroll,
+        PayrollArchive,
         ArchiveLog,
     )
-    return all(
-        session.scalar(select(func.count()).select_from(table)) == 0 for table in tables
+    return bool(
+        session.scalar(select(and_(*(~exists().select_from(table) for table in tables))))
     )
 
 
@@ -316,29 +671,29 @@ def seed_data(session: Optional[Session] = None) -> None:
 
         session.add_all(payrolls)
 
-        archive_1 = ArchiveLog(
-            source_table="payrolls",
-            payload={
-                "id": 9001,
-                "employee_id": employee_1.id,
-                "period_start": "2023-09-01",
-                "period_end": "2023-09-30",
-                "net_amount": 50500.00,
-                "paid_at": "2023-10-10T10:00:00",
-                "is_paid": True,
-            },
+        archive_ids = session.scalars(
+            text(
+                "SELECT nextval(pg_get_serial_sequence('payrolls', 'id')) "
+                "FROM generate_series(1, 2)"
+            )
+        ).all()
+        archive_1 = PayrollArchive(
+            id=archive_ids[0],
+            employee_id=employee_1.id,
+            period_start=date(2023, 9, 1),
+            period_end=date(2023, 9, 30),
+            net_amount=50500.00,
+            paid_at=datetime(2023, 10, 10, 10, 0, 0),
+            is_paid=True,
         )
-        archive_2 = ArchiveLog(
-            source_table="payrolls",
-            payload={
-                "id": 9002,
-                "employee_id": employee_2.id,
-                "period_start": "2023-10-01",
-                "period_end": "2023-10-31",
-                "net_amount": 48200.00,
-                "paid_at": "2023-11-10T10:00:00",
-                "is_paid": True,
-            },
+        archive_2 = PayrollArchive(
+            id=archive_ids[1],
+            employee_id=employee_2.id,
+            period_start=date(2023, 10, 1),
+            period_end=date(2023, 10, 31),
+            net_amount=48200.00,
+            paid_at=datetime(2023, 11, 10, 10, 0, 0),
+            is_paid=True,
         )
 
         session.add_all([archive_1, archive_2])
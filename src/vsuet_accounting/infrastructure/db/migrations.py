@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from vsuet_accounting.infrastructure.db.models import SchemaVersion
+
+MIGRATION_LOCK_KEY = 7_301_001
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+    concurrent: bool = False
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="report filter and join indexes",
+        concurrent=True,
+        statements=(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_employees_department_id "
+            "ON employees (department_id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_expenses_expense_date_id "
+            "ON expenses (expense_date, id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+            "ix_expenses_department_id_expense_date "
+            "ON expenses (department_id, expense_date)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_expenses_vendor_id_expense_date "
+            "ON expenses (vendor_id, expense_date)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_expenses_unapproved "
+            "ON expenses (expense_date) INCLUDE (amount) WHERE NOT is_approved",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_payrolls_period_end_id "
+            "ON payrolls (period_end, id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_payrolls_employee_id_period_end "
+            "ON payrolls (employee_id, period_end)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_payrolls_unpaid "
+            "ON payrolls (period_end) INCLUDE (net_amount) WHERE NOT is_paid",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_archive_log_source_table_id "
+            "ON archive_log (source_table, id)",
+            "ANALYZE employees",
+            "ANALYZE expenses",
+            "ANALYZE payrolls",
+            "ANALYZE archive_log",
+        ),
+    ),
+    Migration(
+        version=2,
+        name="typed payrolls_archive table",
+        statements=(
+            """
+            INSERT INTO payrolls_archive
+                (id, employee_id, period_start, period_end, net_amount,
+                 paid_at, is_paid, archived_at)
+            SELECT
+                (payload->>'id')::int,
+                (payload->>'employee_id')::int,
+                (payload->>'period_start')::date,
+                (payload->>'period_end')::date,
+                (payload->>'net_amount')::numeric,
+                (payload->>'paid_at')::timestamp,
+                (payload->>'is_paid')::boolean,
+                archived_at
+            FROM archive_log
+            WHERE source_table = 'payrolls'
+            ORDER BY id
+            ON CONFLICT (id) DO NOTHING
+            """,
+            """
+            SELECT setval(
+                pg_get_serial_sequence('payrolls', 'id'),
+                GREATEST(
+                    pg_sequence_last_value(
+                        pg_get_serial_sequence('payrolls', 'id')::regclass
+                    ),
+                    (SELECT max(id) FROM payrolls),
+                    (SELECT max(id) FROM payrolls_archive),
+                    1
+                )
+            )
+            """,
+            "ANALYZE payrolls_archive",
+        ),
+    ),
+    Migration(
+        version=3,
+        name="archive_log inserting transaction id",
+        statements=(
+            "ALTER TABLE archive_log ADD COLUMN IF NOT EXISTS txid bigint",
+            "ALTER TABLE archive_log ALTER COLUMN txid "
+            "SET DEFAULT (pg_current_xact_id()::text::bigint)",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="archive_log txid index",
+        concurrent=True,
+        statements=(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_archive_log_txid "
+            "ON archive_log (txid)",
+        ),
+    ),
+)
+
+INVALID_INDEXES_SQL = """
+SELECT c.relname
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE NOT i.indisvalid
+  AND n.nspname = current_schema()
+  AND c.relname LIKE 'ix\\_%'
+"""
+
+
+def latest_version() -> int:
+    return max(migration.version for migration in MIGRATIONS)
+
+
+def applied_versions(conn: Connection) -> set[int]:
+    return set(conn.scalars(text("SELECT version FROM schema_version")).all())
+
+
+def _drop_invalid_indexes(conn: Connection) -> None:
+    for name in conn.scalars(text(INVALID_INDEXES_SQL)).all():
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+        {"version": migration.version, "name": migration.name},
+    )
+
+
+def apply_migrations(engine: Engine) -> list[int]:
+    SchemaVersion.__table__.create(engine, checkfirst=True)
+    applied: list[int] = []
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SET statement_timeout = 0"))
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            done = applied_versions(conn)
+            for migration in MIGRATIONS:
+                if migration.version in done:
+                    continue
+                if migration.concurrent:
+                    _drop_invalid_indexes(conn)
+                    for statement in migration.statements:
+                        conn.execute(text(statement))
+                    _record(conn, migration)
+                else:
+                    with engine.begin() as tx_conn:
+                        tx_conn.execute(text("SET LOCAL statement_timeout = 0"))
+                        for statement in migration.statements:
+                            tx_conn.execute(text(statement))
+                        _record(tx_conn, migration)
+                applied.append(migration.version)
+        finally:
+            conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+            conn.execute(text("RESET statement_timeout"))
+
+    return applied
@@ -3,17 +3,20 @@ from __future__ import annotations
 from datetime import date, datetime
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    CheckConstraint,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 
 class Base(DeclarativeBase):
@@ -37,6 +40,7 @@ class Department(Base):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (Index("ix_employees_department_id", "department_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     department_id: Mapped[int] = mapped_column(
@@ -67,6 +71,17 @@ class Vendor(Base):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_expense_date_id", "expense_date", "id"),
+        Index("ix_expenses_department_id_expense_date", "department_id", "expense_date"),
+        Index("ix_expenses_vendor_id_expense_date", "vendor_id", "expense_date"),
+        Index(
+            "ix_expenses_unapproved",
+            "expense_date",
+            postgresql_include=["amount"],
+            postgresql_where=text("NOT is_approved"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     department_id: Mapped[int] = mapped_column(
@@ -85,6 +100,16 @@ class Expense(Base):
 
 class Payroll(Base):
     __tablename__ = "payrolls"
+    __table_args__ = (
+        Index("ix_payrolls_period_end_id", "period_end", "id"),
+        Index("ix_payrolls_employee_id_period_end", "employee_id", "period_end"),
+        Index(
+            "ix_payrolls_unpaid",
+            "period_end",
+            postgresql_include=["net_amount"],
+            postgresql_where=text("NOT is_paid"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     employee_id: Mapped[int] = mapped_column(
@@ -99,8 +124,58 @@ class Payroll(Base):
     employee: Mapped[Employee] = relationship(back_populates="payrolls")
 
 
+class PayrollArchive(Base):
+    __tablename__ = "payrolls_archive"
+    __table_args__ = (
+        Index("ix_payrolls_archive_period_end_id", "period_end", "id"),
+        Index("ix_payrolls_archive_employee_id_period_end", "employee_id", "period_end"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    employee_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False)
+    net_amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    paid_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    is_paid: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+
+
+class ExpenseMonthlyRollup(Base):
+    __tablename__ = "expense_monthly_rollup"
+    __table_args__ = (Index("ix_expense_monthly_rollup_month", "month"),)
+
+    department_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    vendor_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    is_approved: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    total_amount: Mapped[float] = mapped_column(Numeric(16, 2), nullable=False)
+    row_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class PayrollMonthlyRollup(Base):
+    __tablename__ = "payroll_monthly_rollup"
+    __table_args__ = (
+        Index("ix_payroll_monthly_rollup_employee_month", "employee_id", "month"),
+        Index("ix_payroll_monthly_rollup_month", "month"),
+    )
+
+    department_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    employee_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    is_paid: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    total_net: Mapped[float] = mapped_column(Numeric(16, 2), nullable=False)
+    row_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
 class ArchiveLog(Base):
     __tablename__ = "archive_log"
+    __table_args__ = (
+        Index("ix_archive_log_source_table_id", "source_table", "id"),
+        Index("ix_archive_log_txid", "txid"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     source_table: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -108,3 +183,31 @@ class ArchiveLog(Base):
         DateTime, nullable=False, server_default=func.now()
     )
     payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    txid: Mapped[int | None] = mapped_column(
+        BigInteger,
+        nullable=True,
+        server_default=text("(pg_current_xact_id()::text::bigint)"),
+    )
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+
+
+class SchemaFingerprint(Base):
+    __tablename__ = "schema_fingerprint"
+    __table_args__ = (CheckConstraint("id", name="ck_schema_fingerprint_single_row"),)
+
+    id: Mapped[bool] = mapped_column(
+        Boolean, primary_key=True, server_default=text("true")
+    )
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import AddConstraint, CreateIndex
+
+from vsuet_accounting.infrastructure.db.models import Base, Expense, Payroll
+
+PARTITION_STEPS = ("month", "year")
+
+PARTITION_KEYS: dict[type[Base], str] = {
+    Expense: "expense_date",
+    Payroll: "period_end",
+}
+
+PARTITION_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION ensure_range_partitions(
+    parent text,
+    key_column text,
+    step text,
+    from_date date,
+    to_date date,
+    partition_prefix text DEFAULT NULL
+)
+RETURNS integer AS $$
+DECLARE
+    prefix text := coalesce(partition_prefix, parent);
+    default_name text := coalesce(partition_prefix, parent) || '_default';
+    period_start date := date_trunc(step, from_date)::date;
+    period_end date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    WHILE period_start <= to_date LOOP
+        period_end := (period_start + ('1 ' || step)::interval)::date;
+        partition_name := prefix || '_p' || to_char(
+            period_start, CASE step WHEN 'year' THEN 'YYYY' ELSE 'YYYY_MM' END
+        );
+
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', partition_name, parent
+            );
+            IF to_regclass(default_name) IS NOT NULL THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    default_name, key_column, period_start, key_column, period_end,
+                    partition_name
+                );
+            END IF;
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                parent, partition_name, period_start, period_end
+            );
+            created := created + 1;
+        END IF;
+
+        period_start := period_end;
+    END LOOP;
+
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION archive_payroll_partition(cutoff_date date)
+RETURNS integer AS $$
+DECLARE
+    partition_name text;
+    moved_count integer;
+BEGIN
+    SELECT c.relname INTO partition_name
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    CROSS JOIN LATERAL substring(
+        pg_get_expr(c.relpartbound, c.oid) FROM 'TO \\(''([^'']+)''\\)'
+    ) AS upper_bound
+    WHERE i.inhparent = 'payrolls'::regclass
+      AND upper_bound IS NOT NULL
+      AND upper_bound::date <= cutoff_date
+    ORDER BY upper_bound::date
+    LIMIT 1;
+
+    IF partition_name IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format(
+        'UPDATE payroll_monthly_rollup r '
+        'SET total_net = r.total_net - o.total_net, row_count = r.row_count - o.row_count '
+        'FROM (SELECT employee_id, date_trunc(''month'', period_end)::date AS month, '
+        'is_paid, sum(net_amount) AS total_net, count(*) AS row_count '
+        'FROM %I GROUP BY 1, 2, 3) o '
+        'WHERE r.employee_id = o.employee_id AND r.month = o.month '
+        'AND r.is_paid = o.is_paid',
+        partition_name
+    );
+    EXECUTE format('ALTER TABLE payrolls DETACH PARTITION %I', partition_name);
+    EXECUTE format(
+        'INSERT INTO payrolls_archive '
+        '(id, employee_id, period_start, period_end, net_amount, paid_at, is_paid) '
+        'SELECT id, employee_id, period_start, period_end, net_amount, paid_at, is_paid '
+        'FROM %I',
+        partition_name
+    );
+    GET DIAGNOSTICS moved_count = ROW_COUNT;
+    EXECUTE format('DROP TABLE %I', partition_name);
+
+    RETURN moved_count;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def is_partitioned(conn: Connection, table_name: str) -> bool:
+    return bool(
+        conn.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table_name))"
+            ),
+            {"table_name": table_name},
+        )
+    )
+
+
+def ensure_future_partitions(conn: Connection, step: str, premake: int) -> int:
+    created = 0
+    for model, key_column in PARTITION_KEYS.items():
+        table_name = model.__tablename__
+        if not is_partitioned(conn, table_name):
+            continue
+        created += conn.scalar(
+            text(
+                "SELECT ensure_range_partitions(:table_name, :key_column, :step, "
+                "current_date, (current_date + make_interval("
+                "months => CASE :step WHEN 'year' THEN 12 ELSE 1 END * :premake))::date)"
+            ),
+            {
+                "table_name": table_name,
+                "key_column": key_column,
+                "step": step,
+                "premake": premake,
+            },
+        )
+    return created
+
+
+def partition_table(
+    conn: Connection,
+    model: type[Base],
+    step: str,
+    premake: int,
+    dependent_views: Iterable[str] = (),
+) -> bool:
+    if step not in PARTITION_STEPS:
+        raise ValueError(f"Unsupported partition step: {step!r}")
+
+    table = model.__table__
+    table_name = table.name
+    key_column = PARTITION_KEYS[model]
+    staging_name = f"{table_name}_partitioned"
+    if is_partitioned(conn, table_name):
+        return False
+
+    conn.execute(text(f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE"))
+    for view_name in dependent_views:
+        conn.execute(text(f"DROP VIEW IF EXISTS {view_name}"))
+
+    conn.execute(
+        text(
+            f"CREATE TABLE {staging_name} (LIKE {table_name} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({key_column})"
+        )
+    )
+    conn.execute(
+        text(f"CREATE TABLE {table_name}_default PARTITION OF {staging_name} DEFAULT")
+    )
+    conn.execute(
+        text(
+            "SELECT ensure_range_partitions(:staging_name, :key_column, :step, "
+            f"coalesce((SELECT min({key_column}) FROM {table_name}), current_date), "
+            f"greatest((SELECT max({key_column}) FROM {table_name}), "
+            "(current_date + make_interval("
+            "months => CASE :step WHEN 'year' THEN 12 ELSE 1 END * :premake))::date), "
+            ":table_name)"
+        ),
+        {
+            "staging_name": staging_name,
+            "key_column": key_column,
+            "step": step,
+            "premake": premake,
+            "table_name": table_name,
+        },
+    )
+    conn.execute(text(f"INSERT INTO {staging_name} SELECT * FROM {table_name}"))
+
+    sequence_name = conn.scalar(
+        text("SELECT pg_get_serial_sequence(:table_name, 'id')"),
+        {"table_name": table_name},
+    )
+    if sequence_name:
+        conn.execute(text(f"ALTER SEQUENCE {sequence_name} OWNED BY {staging_name}.id"))
+
+    conn.execute(text(f"DROP TABLE {table_name}"))
+    conn.execute(text(f"ALTER TABLE {staging_name} RENAME TO {table_name}"))
+    conn.execute(text(f"ALTER TABLE {table_name} ADD PRIMARY KEY (id, {key_column})"))
+    for constraint in table.foreign_key_constraints:
+        conn.execute(AddConstraint(constraint))
+    for index in table.indexes:
+        conn.execute(CreateIndex(index))
+    conn.execute(text(f"ANALYZE {table_name}"))
+    return True
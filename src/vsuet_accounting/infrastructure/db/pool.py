@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+import time
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.last_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits += 1
+            self.last_wait = seconds
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def on_checkout(self, *_: Any) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def on_checkin(self, *_: Any) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def on_connect(self, *_: Any) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": self.wait_total / self.waits * 1000
+                if self.waits
+                else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "last_wait_ms": self.last_wait * 1000,
+            }
+
+
+@lru_cache
+def get_pool_metrics() -> PoolMetrics:
+    return PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            elapsed = time.perf_counter() - started
+            get_pool_metrics().record_wait(elapsed, timed_out=True)
+            raise
+        get_pool_metrics().record_wait(time.perf_counter() - started)
+        return connection
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    metrics = get_pool_metrics()
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+    event.listen(engine, "connect", metrics.on_connect)
+    return engine
+
+
+def pool_status(engine: Engine) -> dict[str, Any]:
+    pool = engine.pool
+    status = get_pool_metrics().snapshot()
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "overflow": max(pool.overflow(), 0),
+                "idle": pool.checkedin(),
+                "timeout_s": pool.timeout(),
+            }
+        )
+    return status
@@ -1,17 +1,91 @@
 from __future__ import annotations
 
-from functools import lru_cache
+import threading
+from typing import Any, Optional, Union
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from vsuet_accounting.config import get_settings
+from vsuet_accounting.infrastructure.db.pool import (
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+from vsuet_accounting.infrastructure.db.statements import instrument_statements
 
+_engine: Optional[Engine] = None
+_sessionmaker: Optional[sessionmaker] = None
+_lock = threading.Lock()
 
-@lru_cache
-def get_engine():
+
+def connect_args(settings) -> dict[str, str]:
+    args = {"application_name": settings.db_application_name}
+    if settings.db_statement_timeout_ms:
+        args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    return args
+
+
+def create_db_engine(url: Optional[str] = None, **options: Any) -> Engine:
     settings = get_settings()
-    return create_engine(settings.database_url, pool_pre_ping=True, future=True)
+    engine_options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "connect_args": connect_args(settings),
+        **options,
+    }
+    engine = instrument_engine(
+        create_engine(url or settings.database_url, **engine_options)
+    )
+    if settings.db_statement_stats:
+        instrument_statements(engine)
+    return engine
+
+
+def make_sessionmaker(bind: Union[Engine, str, None] = None) -> sessionmaker:
+    if bind is None or isinstance(bind, str):
+        bind = create_db_engine(bind)
+    return sessionmaker(autocommit=False, autoflush=False, bind=bind)
+
+
+def configure_database(bind: Union[Engine, str, None] = None) -> Engine:
+    global _engine, _sessionmaker
+    engine = bind if isinstance(bind, Engine) else create_db_engine(bind)
+    with _lock:
+        _engine = engine
+        _sessionmaker = make_sessionmaker(engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = create_db_engine()
+    return _engine
+
+
+def get_sessionmaker() -> sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        engine = get_engine()
+        with _lock:
+            if _sessionmaker is None:
+                _sessionmaker = make_sessionmaker(engine)
+    return _sessionmaker
+
+
+class LazySessionFactory:
+    def __call__(self, **options: Any) -> Session:
+        return get_sessionmaker()(**options)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_sessionmaker(), name)
 
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+SessionLocal = LazySessionFactory()
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from vsuet_accounting.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SKIP_OPTION = "skip_statement_stats"
+EXPLAINABLE = ("select", "with")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r"%\([^)]+\)s|%s|\$\d+")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACES = re.compile(r"\s+")
+_SIDE_EFFECTS = re.compile(
+    r"\b(?:insert|update|delete|merge)\b"
+    r"|\b(?:pg_(?:try_)?advisory\w*|setval|nextval|pg_sleep\w*|pg_notify"
+    r"|pg_cancel_backend|pg_terminate_backend|set_config|dblink\w*|lo_\w+)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def fingerprint(statement: str) -> str:
+    normalized = _COMMENTS.sub(" ", statement)
+    normalized = _STRINGS.sub("?", normalized)
+    normalized = _PLACEHOLDERS.sub("?", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _LISTS.sub("(...)", normalized)
+    normalized = _ROWS.sub("(...), ...", normalized)
+    return _SPACES.sub(" ", normalized).strip()
+
+
+@dataclass(frozen=True)
+class SlowStatement:
+    fingerprint: str
+    statement: str
+    parameters: Any
+    duration_ms: float
+    rows: int
+    executed_at: datetime
+    executemany: bool
+
+    @property
+    def explainable(self) -> bool:
+        if self.executemany:
+            return False
+        code = _STRINGS.sub("''", _COMMENTS.sub(" ", self.statement)).strip()
+        return (
+            bool(code)
+            and code.split(None, 1)[0].lower() in EXPLAINABLE
+            and not _SIDE_EFFECTS.search(code)
+        )
+
+
+class StatementStats:
+    def __init__(
+        self, slow_ms: int, slow_log_size: int, max_fingerprints: int
+    ) -> None:
+        self._lock = threading.Lock()
+        self.slow_ms = slow_ms
+        self.max_fingerprints = max_fingerprints
+        self.statements: dict[str, dict[str, Any]] = {}
+        self.slow: deque[SlowStatement] = deque(maxlen=slow_log_size)
+        self.dropped = 0
+        self.errors = 0
+        self.since = datetime.now()
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        seconds: float,
+        rows: int,
+        executemany: bool,
+    ) -> None:
+        key = fingerprint(statement)
+        duration_ms = seconds * 1000
+        with self._lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                if len(self.statements) >= self.max_fingerprints:
+                    self.dropped += 1
+                else:
+                    entry = self.statements[key] = {
+                        "calls": 0,
+                        "total_ms": 0.0,
+                        "max_ms": 0.0,
+                        "rows": 0,
+                        "slow": 0,
+                    }
+            slow = bool(self.slow_ms) and duration_ms >= self.slow_ms
+            if entry is not None:
+                entry["calls"] += 1
+                entry["total_ms"] += duration_ms
+                entry["max_ms"] = max(entry["max_ms"], duration_ms)
+                entry["rows"] += rows
+                entry["slow"] += slow
+            if slow:
+                self.slow.append(
+                    SlowStatement(
+                        key,
+                        statement,
+                        parameters,
+                        duration_ms,
+                        rows,
+                        datetime.now(),
+                        executemany,
+                    )
+                )
+        if slow:
+            logger.warning(
+                "slow statement (%.1f ms, %d rows): %s", duration_ms, rows, key
+            )
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements.clear()
+            self.slow.clear()
+            self.dropped = 0
+            self.errors = 0
+            self.since = datetime.now()
+
+    def top(
+        self, limit: int = 20, order_by: str = "total_ms"
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": key,
+                    **entry,
+                    "avg_ms": entry["total_ms"] / entry["calls"],
+                }
+                for key, entry in self.statements.items()
+            ]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def slow_statements(self) -> list[SlowStatement]:
+        with self._lock:
+            return list(reversed(self.slow))
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "fingerprints": len(self.statements),
+                "calls": sum(entry["calls"] for entry in self.statements.values()),
+                "total_ms": sum(
+                    entry["total_ms"] for entry in self.statements.values()
+                ),
+                "slow": sum(entry["slow"] for entry in self.statements.values()),
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "slow_ms": self.slow_ms,
+                "since": self.since,
+            }
+
+
+@lru_cache
+def get_statement_stats() -> StatementStats:
+    settings = get_settings()
+    return StatementStats(
+        settings.db_slow_query_ms,
+        settings.db_slow_query_log_size,
+        settings.db_statement_stats_max,
+    )
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    started = conn.info.get("statement_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if context is not None and context.execution_options.get(SKIP_OPTION):
+        return
+    get_statement_stats().record(
+        statement, parameters, elapsed, max(cursor.rowcount, 0), executemany
+    )
+
+
+def _handle_error(context) -> None:
+    connection = context.connection
+    if connection is None:
+        return
+    started = connection.info.get("statement_started")
+    if started:
+        started.pop()
+        execution = context.execution_context
+        if execution is None or not execution.execution_options.get(SKIP_OPTION):
+            get_statement_stats().record_error()
+
+
+def statements_instrumented(engine: Engine) -> bool:
+    return event.contains(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def instrument_statements(engine: Engine) -> Engine:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+def explain_analyze(engine: Engine, slow: SlowStatement) -> str:
+    if not slow.explainable:
+        raise ValueError(
+            "EXPLAIN поддерживается только для SELECT/WITH без изменения данных, "
+            "блокировок и последовательностей"
+        )
+    from vsuet_accounting.infrastructure.db.session import connect_args
+
+    explain_engine = create_engine(
+        engine.url, poolclass=NullPool, connect_args=connect_args(get_settings())
+    )
+    try:
+        with explain_engine.connect() as connection:
+            transaction = connection.begin()
+            try:
+                connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+                result = connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {slow.statement}", slow.parameters
+                )
+                return "\n".join(row[0] for row in result)
+            finally:
+                transaction.rollback()
+    finally:
+        explain_engine.dispose()
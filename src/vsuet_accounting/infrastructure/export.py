@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+from vsuet_accounting.config import get_settings
+
+EXPORT_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+def get_export_dir() -> Path:
+    export_dir = Path(get_settings().backup_dir) / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    return export_dir
+
+
+def prune_exports(max_age_seconds: int = EXPORT_MAX_AGE_SECONDS) -> int:
+    threshold = time.time() - max_age_seconds
+    removed = 0
+    for path in get_export_dir().glob("*.csv.gz"):
+        if path.stat().st_mtime < threshold:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def export_csv_gz(
+    chunks: Iterable[Sequence[Mapping[str, Any]]], prefix: str
+) -> tuple[Path, int]:
+    prune_exports()
+    handle = tempfile.NamedTemporaryFile(
+        dir=get_export_dir(), prefix=f"{prefix}_", suffix=".csv.gz", delete=False
+    )
+    export_file = Path(handle.name)
+    row_count = 0
+    try:
+        with handle, gzip.open(handle, "wt", encoding="utf-8", newline="") as stream:
+            writer = None
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if writer is None:
+                    writer = csv.DictWriter(stream, fieldnames=list(chunk[0].keys()))
+                    writer.writeheader()
+                writer.writerows(chunk)
+                row_count += len(chunk)
+    except BaseException:
+        export_file.unlink(missing_ok=True)
+        raise
+
+    return export_file, row_count
@@ -3,23 +3,58 @@ from __future__ import annotations
 from datetime import date, datetime
 from pathlib import Path
 import subprocess
+from typing import TYPE_CHECKING, Optional
 
-import pandas as pd
 import streamlit as st
 from sqlalchemy.exc import SQLAlchemyError
 
 from vsuet_accounting.application import services
+from vsuet_accounting.application.cache import clear_caches, get_report_cache
 from vsuet_accounting.domain import schemas
 from vsuet_accounting.config import get_settings
-from vsuet_accounting.infrastructure import backup as backup_ops
 from vsuet_accounting.infrastructure.db.init_db import init_db
+from vsuet_accounting.infrastructure.db.models import Base
+from vsuet_accounting.infrastructure.db.pool import pool_status
 from vsuet_accounting.infrastructure.db.session import SessionLocal, get_engine
+from vsuet_accounting.infrastructure.db.statements import (
+    explain_analyze,
+    get_statement_stats,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+BACKUP_FORMAT_LABELS = {
+    "plain": "SQL (psql, совместимый)",
+    "custom": "Custom (сжатый, pg_restore -j)",
+    "directory": "Directory (сжатый, pg_dump -j)",
+}
+
+STREAMED_EXPORTS = {
+    "Отчет по расходам": (services.iter_expenses_report, "otchet_rashody"),
+    "Отчет по выплатам": (services.iter_payrolls_report, "otchet_vyplaty"),
+}
+
+
+def rows_frame(rows, columns, numeric=()) -> pd.DataFrame:
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(rows, columns=list(rows[0]._fields))[list(columns)]
+    for column in numeric:
+        frame[column] = frame[column].astype(float)
+    return frame
+
+
+def option_index(options: dict[str, int], value: int) -> int:
+    values = list(options.values())
+    return values.index(value) if value in values else 0
 
 
 @st.cache_resource
 def initialize_db() -> None:
     engine = get_engine()
-    init_db(engine)
+    init_db(engine, seed=False)
 
 
 def run_app() -> None:
@@ -50,17 +85,42 @@ def render_overview() -> None:
         "Учетная система университета: подразделения, сотрудники, расходы и выплаты."
     )
 
+    estimated = st.checkbox(
+        "Приблизительный подсчет (быстрее на больших таблицах)", value=False
+    )
     with SessionLocal() as session:
-        dept_count = len(services.list_departments(session))
-        emp_count = len(services.list_employees(session))
-        exp_count = len(services.list_expenses(session))
-        payroll_count = len(services.list_payrolls(session))
+        counts = services.dashboard_counts(session, estimated=estimated)
 
     cols = st.columns(4)
-    cols[0].metric("Подразделения", dept_count)
-    cols[1].metric("Сотрудники", emp_count)
-    cols[2].metric("Расходы", exp_count)
-    cols[3].metric("Выплаты", payroll_count)
+    cols[0].metric("Подразделения", counts["departments"])
+    cols[1].metric("Сотрудники", counts["employees"])
+    cols[2].metric("Расходы", counts["expenses"])
+    cols[3].metric("Выплаты", counts["payrolls"])
+
+    cols = st.columns(2)
+    cols[0].metric(
+        "Неутвержденные расходы", f"{float(counts['unapproved_expenses_total']):,.2f}"
+    )
+    cols[1].metric(
+        "Невыплаченная зарплата", f"{float(counts['unpaid_payrolls_total']):,.2f}"
+    )
+
+
+def current_cursor(key: str) -> Optional[str]:
+    cursors = st.session_state.setdefault(f"{key}_cursors", [])
+    return cursors[-1] if cursors else None
+
+
+def render_pager(key: str, next_cursor: Optional[str]) -> None:
+    cursors = st.session_state.setdefault(f"{key}_cursors", [])
+    col1, col2, col3 = st.columns([1, 1, 4])
+    if col1.button("← Назад", key=f"{key}_prev", disabled=not cursors):
+        cursors.pop()
+        st.rerun()
+    if col2.button("Далее →", key=f"{key}_next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+    col3.caption(f"Страница {len(cursors) + 1}")
 
 
 def render_reference_data() -> None:
@@ -78,7 +138,7 @@ def render_reference_data() -> None:
 def render_departments() -> None:
     st.subheader("Подразделения")
     with SessionLocal() as session:
-        departments = services.list_departments(session)
+        departments = services.list_departments_rows(session)
 
     with st.form("add_department", clear_on_submit=True):
         name = st.text_input("Название подразделения")
@@ -96,15 +156,7 @@ def render_departments() -> None:
                 st.success("Подразделение добавлено.")
 
     if departments:
-        st.dataframe(
-            pd.DataFrame(
-                [
-                    {"id": d.id, "name": d.name, "code": d.code}
-                    for d in departments
-                ]
-            ),
-            width="stretch",
-        )
+        st.dataframe(rows_frame(departments, ["id", "name", "code"]), width="stretch")
 
         selected = st.selectbox(
             "Выберите подразделение",
@@ -135,14 +187,16 @@ def render_departments() -> None:
 def render_employees() -> None:
     st.subheader("Сотрудники")
     with SessionLocal() as session:
-        employees = services.list_employees(session)
-        departments = services.list_departments(session)
+        employees = services.list_employees_rows(session)
+        departments = services.department_options(
+            session, required={row.department_id for row in employees}
+        )
 
     if not departments:
         st.warning("Сначала добавьте подразделения.")
         return
 
-    dept_options = {dept.name: dept.id for dept in departments}
+    dept_options = {name: dept_id for dept_id, name in departments}
 
     with st.form("add_employee", clear_on_submit=True):
         full_name = st.text_input("ФИО")
@@ -165,26 +219,34 @@ def render_employees() -> None:
 
     if employees:
         st.dataframe(
-            pd.DataFrame(
-                [
-                    {
-                        "id": e.id,
-                        "full_name": e.full_name,
-                        "department": e.department.name,
-                        "hire_date": e.hire_date,
-                        "base_salary": float(e.base_salary),
-                        "is_active": e.is_active,
-                    }
-                    for e in employees
-                ]
+            rows_frame(
+                employees,
+                ["id", "full_name", "department", "hire_date", "base_salary", "is_active"],
+                numeric=["base_salary"],
             ),
             width="stretch",
         )
 
+        bulk_selected = st.multiselect(
+            "Выбрать сотрудников для перевода",
+            employees,
+            format_func=lambda e: f"{e.full_name} ({e.department})",
+            key="bulk_employees",
+        )
+        bulk_dept = st.selectbox(
+            "Новое подразделение", list(dept_options.keys()), key="bulk_emp_dept"
+        )
+        if st.button("Перевести выбранных", disabled=not bulk_selected):
+            with SessionLocal() as session:
+                moved = services.reassign_employees(
+                    session, [e.id for e in bulk_selected], dept_options[bulk_dept]
+                )
+            st.success(f"Переведено сотрудников: {moved}")
+
         selected = st.selectbox(
             "Выберите сотрудника",
             employees,
-            format_func=lambda e: f"{e.full_name} ({e.department.name})",
+            format_func=lambda e: f"{e.full_name} ({e.department})",
         )
         full_name = st.text_input(
             "ФИО", value=selected.full_name, key=f"emp_name_{selected.id}"
@@ -205,7 +267,7 @@ def render_employees() -> None:
         dept_name = st.selectbox(
             "Подразделение",
             list(dept_options.keys()),
-            index=list(dept_options.values()).index(selected.department_id),
+            index=option_index(dept_options, selected.department_id),
             key=f"emp_dept_{selected.id}",
         )
         col1, col2 = st.columns(2)
@@ -231,7 +293,7 @@ def render_employees() -> None:
 def render_vendors() -> None:
     st.subheader("Поставщики")
     with SessionLocal() as session:
-        vendors = services.list_vendors(session)
+        vendors = services.list_vendors_rows(session)
 
     with st.form("add_vendor", clear_on_submit=True):
         name = st.text_input("Название поставщика")
@@ -244,12 +306,7 @@ def render_vendors() -> None:
             st.success("Поставщик добавлен.")
 
     if vendors:
-        st.dataframe(
-            pd.DataFrame(
-                [{"id": v.id, "name": v.name, "inn": v.inn} for v in vendors]
-            ),
-            width="stretch",
-        )
+        st.dataframe(rows_frame(vendors, ["id", "name", "inn"]), width="stretch")
 
         selected = st.selectbox(
             "Выберите поставщика",
@@ -287,16 +344,22 @@ def render_operations() -> None:
 def render_expenses() -> None:
     st.subheader("Расходы")
     with SessionLocal() as session:
-        expenses = services.list_expenses(session)
-        departments = services.list_departments(session)
-        vendors = services.list_vendors(session)
+        expenses, next_cursor = services.list_expenses_rows(
+            session, cursor=current_cursor("expenses")
+        )
+        departments = services.department_options(
+            session, required={row.department_id for row in expenses}
+        )
+        vendors = services.vendor_options(
+            session, required={row.vendor_id for row in expenses}
+        )
 
     if not departments or not vendors:
         st.warning("Сначала добавьте подразделения и поставщиков.")
         return
 
-    dept_options = {dept.name: dept.id for dept in departments}
-    vendor_options = {vendor.name: vendor.id for vendor in vendors}
+    dept_options = {name: dept_id for dept_id, name in departments}
+    vendor_options = {name: vendor_id for vendor_id, name in vendors}
 
     with st.form("add_expense", clear_on_submit=True):
         department_name = st.selectbox("Подразделение", list(dept_options.keys()))
@@ -319,37 +382,70 @@ def render_expenses() -> None:
 
     if expenses:
         st.dataframe(
-            pd.DataFrame(
-                [
-                    {
-                        "id": e.id,
-                        "department": e.department.name,
-                        "vendor": e.vendor.name,
-                        "amount": float(e.amount),
-                        "expense_date": e.expense_date,
-                        "is_approved": e.is_approved,
-                    }
-                    for e in expenses
-                ]
+            rows_frame(
+                expenses,
+                ["id", "department", "vendor", "amount", "expense_date", "is_approved"],
+                numeric=["amount"],
             ),
             width="stretch",
         )
+        render_pager("expenses", next_cursor)
+
+        bulk_selected = st.multiselect(
+            "Выбрать расходы для массовых действий",
+            expenses,
+            format_func=lambda e: f"№{e.id} {e.department} {e.amount}",
+            key="bulk_expenses",
+        )
+        bulk_col1, bulk_col2 = st.columns(2)
+        if bulk_col1.button("Утвердить выбранные", disabled=not bulk_selected):
+            with SessionLocal() as session:
+                changed = services.set_expenses_approved(
+                    session, ids=[e.id for e in bulk_selected]
+                )
+            st.success(f"Утверждено расходов: {changed}")
+        if bulk_col2.button("Удалить выбранные", disabled=not bulk_selected):
+            with SessionLocal() as session:
+                removed = services.delete_expenses(session, [e.id for e in bulk_selected])
+            st.success(f"Удалено расходов: {removed}")
+
+        with st.expander("Утвердить по фильтру"):
+            bulk_dept = st.selectbox(
+                "Подразделение", ["Все"] + list(dept_options.keys()), key="bulk_dept"
+            )
+            bulk_vendor = st.selectbox(
+                "Поставщик", ["Все"] + list(vendor_options.keys()), key="bulk_vendor"
+            )
+            bulk_from = st.date_input(
+                "Дата с", value=date.today().replace(day=1), key="bulk_from"
+            )
+            bulk_to = st.date_input("Дата по", value=date.today(), key="bulk_to")
+            if st.button("Утвердить все по фильтру"):
+                with SessionLocal() as session:
+                    changed = services.set_expenses_approved(
+                        session,
+                        department_id=dept_options.get(bulk_dept),
+                        vendor_id=vendor_options.get(bulk_vendor),
+                        date_from=bulk_from,
+                        date_to=bulk_to,
+                    )
+                st.success(f"Утверждено расходов: {changed}")
 
         selected = st.selectbox(
             "Выберите расход",
             expenses,
-            format_func=lambda e: f"№{e.id} {e.department.name} {e.amount}",
+            format_func=lambda e: f"№{e.id} {e.department} {e.amount}",
         )
         department_name = st.selectbox(
             "Подразделение",
             list(dept_options.keys()),
-            index=list(dept_options.values()).index(selected.department_id),
+            index=option_index(dept_options, selected.department_id),
             key=f"expense_dept_{selected.id}",
         )
         vendor_name = st.selectbox(
             "Поставщик",
             list(vendor_options.keys()),
-            index=list(vendor_options.values()).index(selected.vendor_id),
+            index=option_index(vendor_options, selected.vendor_id),
             key=f"expense_vendor_{selected.id}",
         )
         amount = st.number_input(
@@ -387,19 +483,62 @@ def render_expenses() -> None:
             st.success("Расход удален.")
     else:
         st.info("Пока нет расходов.")
+        if current_cursor("expenses"):
+            render_pager("expenses", None)
 
 
 def render_payrolls() -> None:
     st.subheader("Выплаты")
     with SessionLocal() as session:
-        payrolls = services.list_payrolls(session)
-        employees = services.list_employees(session)
+        payrolls, next_cursor = services.list_payrolls_rows(
+            session, cursor=current_cursor("payrolls")
+        )
+        employees = services.employee_options(
+            session, required={row.employee_id for row in payrolls}
+        )
+        departments = services.department_options(session)
 
     if not employees:
         st.warning("Сначала добавьте сотрудников.")
         return
 
-    employee_options = {emp.full_name: emp.id for emp in employees}
+    employee_options = {name: emp_id for emp_id, name in employees}
+
+    with st.form("payroll_run"):
+        st.markdown("**Начисление за период для всех активных сотрудников**")
+        run_department_options = {"Все": None}
+        run_department_options.update({name: dept_id for dept_id, name in departments})
+        run_department = st.selectbox(
+            "Подразделение", list(run_department_options.keys())
+        )
+        run_start = st.date_input(
+            "Период с", value=date.today().replace(day=1), key="payroll_run_start"
+        )
+        run_end = st.date_input("Период по", value=date.today(), key="payroll_run_end")
+        net_ratio = st.number_input(
+            "Доля оклада к выплате",
+            min_value=0.0,
+            max_value=1.0,
+            step=0.01,
+            value=services.PAYROLL_NET_RATIO,
+        )
+        if st.form_submit_button("Начислить"):
+            try:
+                with SessionLocal() as session:
+                    summary = services.generate_payroll_run(
+                        session,
+                        run_start,
+                        run_end,
+                        department_id=run_department_options[run_department],
+                        net_ratio=net_ratio,
+                    )
+                st.success(
+                    f"Создано выплат: {summary['created']} на сумму "
+                    f"{summary['total_net']:,.2f}; пропущено (уже начислено): "
+                    f"{summary['skipped']}."
+                )
+            except (ValueError, SQLAlchemyError) as exc:
+                st.error(f"Ошибка начисления: {exc}")
 
     with st.form("add_payroll", clear_on_submit=True):
         employee_name = st.selectbox("Сотрудник", list(employee_options.keys()))
@@ -428,32 +567,55 @@ def render_payrolls() -> None:
 
     if payrolls:
         st.dataframe(
-            pd.DataFrame(
+            rows_frame(
+                payrolls,
                 [
-                    {
-                        "id": p.id,
-                        "employee": p.employee.full_name,
-                        "period_start": p.period_start,
-                        "period_end": p.period_end,
-                        "net_amount": float(p.net_amount),
-                        "paid_at": p.paid_at,
-                        "is_paid": p.is_paid,
-                    }
-                    for p in payrolls
-                ]
+                    "id",
+                    "employee",
+                    "period_start",
+                    "period_end",
+                    "net_amount",
+                    "paid_at",
+                    "is_paid",
+                ],
+                numeric=["net_amount"],
             ),
             width="stretch",
         )
+        render_pager("payrolls", next_cursor)
+
+        bulk_selected = st.multiselect(
+            "Выбрать выплаты для массовых действий",
+            payrolls,
+            format_func=lambda p: f"№{p.id} {p.employee}",
+            key="bulk_payrolls",
+        )
+        bulk_paid_at = st.date_input(
+            "Дата выплаты", value=date.today(), key="bulk_paid_at"
+        )
+        bulk_col1, bulk_col2 = st.columns(2)
+        if bulk_col1.button("Отметить оплаченными", disabled=not bulk_selected):
+            with SessionLocal() as session:
+                changed = services.mark_payrolls_paid(
+                    session,
+                    [p.id for p in bulk_selected],
+                    datetime.combine(bulk_paid_at, datetime.min.time()),
+                )
+            st.success(f"Отмечено оплаченными: {changed}")
+        if bulk_col2.button("Удалить выбранные", disabled=not bulk_selected):
+            with SessionLocal() as session:
+                removed = services.delete_payrolls(session, [p.id for p in bulk_selected])
+            st.success(f"Удалено выплат: {removed}")
 
         selected = st.selectbox(
             "Выберите выплату",
             payrolls,
-            format_func=lambda p: f"№{p.id} {p.employee.full_name}",
+            format_func=lambda p: f"№{p.id} {p.employee}",
         )
         employee_name = st.selectbox(
             "Сотрудник",
             list(employee_options.keys()),
-            index=list(employee_options.values()).index(selected.employee_id),
+            index=option_index(employee_options, selected.employee_id),
             key=f"payroll_emp_{selected.id}",
         )
         period_start = st.date_input(
@@ -506,15 +668,17 @@ def render_payrolls() -> None:
             st.success("Выплата удалена.")
     else:
         st.info("Пока нет выплат.")
+        if current_cursor("payrolls"):
+            render_pager("payrolls", None)
 
 
 def render_reports() -> None:
     st.header("Отчеты")
 
     with SessionLocal() as session:
-        departments = services.list_departments(session)
-        vendors = services.list_vendors(session)
-        employees = services.list_employees(session)
+        departments = services.department_options(session)
+        vendors = services.vendor_options(session)
+        employees = services.employee_options(session)
 
     report_type = st.selectbox(
         "Тип отчета",
@@ -523,9 +687,9 @@ def render_reports() -> None:
 
     if report_type in {"Отчет по расходам", "Сводка расходов"}:
         dept_map = {"Все": None}
-        dept_map.update({dept.name: dept.id for dept in departments})
+        dept_map.update({name: dept_id for dept_id, name in departments})
         vendor_map = {"Все": None}
-        vendor_map.update({vendor.name: vendor.id for vendor in vendors})
+        vendor_map.update({name: vendor_id for vendor_id, name in vendors})
 
         department_choice = st.selectbox("Подразделение", list(dept_map.keys()))
         vendor_choice = st.selectbox("Поставщик", list(vendor_map.keys()))
@@ -533,28 +697,26 @@ def render_reports() -> None:
         date_to = st.date_input("Дата по", value=date.today())
         approved_only = st.checkbox("Только утвержденные", value=False)
 
+        filters = {
+            "department_id": dept_map[department_choice],
+            "vendor_id": vendor_map[vendor_choice],
+            "date_from": date_from,
+            "date_to": date_to,
+            "approved_only": approved_only,
+        }
         with SessionLocal() as session:
             if report_type == "Отчет по расходам":
-                rows = services.expenses_report(
-                    session,
-                    department_id=dept_map[department_choice],
-                    vendor_id=vendor_map[vendor_choice],
-                    date_from=date_from,
-                    date_to=date_to,
-                    approved_only=approved_only,
-                )
+                df = services.expenses_report_frame(session, **filters)
             else:
-                rows = services.expenses_summary(
+                df = services.expenses_summary_frame(
                     session,
                     date_from=date_from,
                     date_to=date_to,
                 )
 
-        df = pd.DataFrame(rows)
-
     else:
         emp_map = {"Все": None}
-        emp_map.update({emp.full_name: emp.id for emp in employees})
+        emp_map.update({name: emp_id for emp_id, name in employees})
         employee_choice = st.selectbox("Сотрудник", list(emp_map.keys()))
         date_from = st.date_input("Период с", value=date(2024, 1, 1))
         date_to = st.date_input("Период по", value=date.today())
@@ -567,36 +729,36 @@ def render_reports() -> None:
         elif paid_filter == "Не оплачено":
             paid_only = False
 
+        filters = {
+            "employee_id": emp_map[employee_choice],
+            "date_from": date_from,
+            "date_to": date_to,
+            "paid_only": paid_only,
+            "include_archived": include_archived,
+        }
         with SessionLocal() as session:
             if report_type == "Отчет по выплатам":
-                rows = services.payrolls_report(
-                    session,
-                    employee_id=emp_map[employee_choice],
-                    date_from=date_from,
-                    date_to=date_to,
-                    paid_only=paid_only,
-                    include_archived=include_archived,
-                )
+                df = services.payrolls_report_frame(session, **filters)
             else:
-                rows = services.payrolls_summary(
+                df = services.payrolls_summary_frame(
                     session,
                     date_from=date_from,
                     date_to=date_to,
                 )
 
-        df = pd.DataFrame(rows)
-
     if df.empty:
         st.info("Нет данных для выбранных фильтров.")
         return
 
     st.dataframe(df, width="stretch")
 
+    if report_type in STREAMED_EXPORTS:
+        render_streamed_export(report_type, filters)
+        return
+
     csv = df.to_csv(index=False).encode("utf-8")
     file_name_map = {
-        "Отчет по расходам": "otchet_rashody.csv",
         "Сводка расходов": "svodka_rashody.csv",
-        "Отчет по выплатам": "otchet_vyplaty.csv",
         "Сводка выплат": "svodka_vyplaty.csv",
     }
     st.download_button(
@@ -607,41 +769,428 @@ def render_reports() -> None:
     )
 
 
+def render_streamed_export(report_type: str, filters: dict) -> None:
+    from vsuet_accounting.infrastructure import export as export_ops
+
+    iter_report, file_prefix = STREAMED_EXPORTS[report_type]
+    state_key = f"export_{file_prefix}"
+
+    if st.button("Подготовить CSV.gz"):
+        with SessionLocal() as session:
+            export_file, row_count = export_ops.export_csv_gz(
+                iter_report(session, **filters), file_prefix
+            )
+        st.session_state[state_key] = (filters, str(export_file), row_count)
+
+    prepared = st.session_state.get(state_key)
+    if not prepared or prepared[0] != filters or not Path(prepared[1]).exists():
+        return
+
+    _, export_path, row_count = prepared
+    st.caption(f"Строк в выгрузке: {row_count}")
+    with open(export_path, "rb") as export_file:
+        st.download_button(
+            "Скачать CSV.gz",
+            export_file,
+            file_name=f"{file_prefix}.csv.gz",
+            mime="application/gzip",
+        )
+
+
 def render_service() -> None:
+    import pandas as pd
+
+    from vsuet_accounting.application import imports as import_ops
+    from vsuet_accounting.infrastructure import archive_export
+    from vsuet_accounting.infrastructure import backup as backup_ops
+
     st.header("Сервис")
     settings = get_settings()
 
     st.subheader("Резервное копирование")
-    backup_name = f"backup_{datetime.now():%Y%m%d_%H%M%S}.sql"
-    backup_path = str(Path(settings.backup_dir) / backup_name)
+    backup_format = st.selectbox(
+        "Формат",
+        list(backup_ops.BACKUP_FORMATS),
+        index=list(backup_ops.BACKUP_FORMATS).index(settings.backup_format),
+        format_func=lambda fmt: BACKUP_FORMAT_LABELS[fmt],
+    )
+    col1, col2 = st.columns(2)
+    backup_jobs = col1.number_input(
+        "Параллельных потоков",
+        min_value=1,
+        max_value=16,
+        value=settings.backup_jobs,
+        disabled=backup_format != "directory",
+    )
+    backup_compress = col2.number_input(
+        "Уровень сжатия",
+        min_value=0,
+        max_value=9,
+        value=settings.backup_compress,
+        disabled=backup_format == "plain",
+    )
+    exclude_table_data = st.multiselect(
+        "Без данных таблиц (только структура)",
+        [table.name for table in Base.metadata.sorted_tables],
+        default=settings.backup_exclude_table_data,
+    )
     if st.button("Создать бэкап"):
         try:
-            backup_ops.backup_database(backup_path)
-            st.success(f"Бэкап создан: {backup_path}")
-        except (subprocess.CalledProcessError, FileNotFoundError, SQLAlchemyError) as exc:
+            entry = backup_ops.run_backup(
+                fmt=backup_format,
+                jobs=int(backup_jobs),
+                compress=int(backup_compress),
+                exclude_table_data=exclude_table_data,
+            )
+            removed = backup_ops.apply_retention()
+            st.success(
+                f"Бэкап создан: {entry.path} "
+                f"({entry.size_bytes / 1024 / 1024:.1f} МБ "
+                f"за {entry.duration_seconds:.1f} с)"
+                + (f", удалено по политике хранения: {len(removed)}" if removed else "")
+            )
+        except (subprocess.CalledProcessError, OSError, SQLAlchemyError) as exc:
             st.error(f"Ошибка бэкапа: {exc}")
 
+    catalog = backup_ops.load_catalog()
+    if catalog:
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "Файл": entry.name,
+                        "Формат": entry.format,
+                        "Создан": entry.created_at,
+                        "Размер, МБ": round(entry.size_bytes / 1024 / 1024, 1),
+                        "Длительность, с": round(entry.duration_seconds, 1),
+                        "Без данных": ", ".join(entry.excluded_table_data),
+                        "SHA-256": entry.sha256[:16],
+                    }
+                    for entry in catalog
+                ]
+            ),
+            width="stretch",
+        )
+    st.caption(
+        f"Хранение: {settings.backup_keep_daily} ежедневных, "
+        f"{settings.backup_keep_weekly} еженедельных, "
+        f"{settings.backup_keep_monthly} ежемесячных."
+    )
+
+    st.subheader("Выгрузка archive_log")
+    manifest = archive_export.load_segment_manifest()
+    st.caption(
+        f"Сегментов: {len(manifest['segments'])}, "
+        f"строк: {sum(segment['rows'] for segment in manifest['segments'])}, "
+        f"последний снимок: {manifest['snapshot'] or '—'}."
+    )
+    if st.button("Выгрузить новые строки"):
+        try:
+            with SessionLocal() as session:
+                segment = archive_export.export_archive_log(session)
+            if segment:
+                st.success(
+                    f"Сегмент {segment['name']}: {segment['rows']} строк, "
+                    f"{segment['size_bytes'] / 1024 / 1024:.1f} МБ"
+                )
+            else:
+                st.info("Новых строк нет.")
+        except (OSError, SQLAlchemyError) as exc:
+            st.error(f"Ошибка выгрузки: {exc}")
+
     st.subheader("Восстановление")
-    uploaded = st.file_uploader("Загрузите .sql бэкап", type=["sql"])
-    if st.button("Восстановить из файла"):
-        if not uploaded:
-            st.warning("Сначала загрузите файл бэкапа.")
+    restore_source = st.radio(
+        "Источник", ["Каталог бэкапов", "Загрузить файл"], horizontal=True
+    )
+    restore_path: Optional[Path] = None
+    expected_sha256: Optional[str] = None
+    if restore_source == "Каталог бэкапов":
+        entry = st.selectbox(
+            "Бэкап",
+            catalog,
+            format_func=lambda item: (
+                f"{item.name} ({item.format}, {item.size_bytes / 1024 / 1024:.1f} МБ)"
+            ),
+        )
+        if entry is not None:
+            restore_path, expected_sha256 = entry.path, entry.sha256
+    else:
+        uploaded = st.file_uploader(
+            "Загрузите бэкап (.sql или .dump)", type=["sql", "dump"]
+        )
+        if uploaded is not None:
+            restore_path = Path(settings.backup_dir) / backup_ops.UPLOAD_DIR / uploaded.name
+    restore_jobs = st.number_input(
+        "Потоков pg_restore", min_value=1, max_value=16, value=settings.backup_jobs
+    )
+    restore_segments = st.checkbox(
+        "Загрузить archive_log из сегментов после восстановления",
+        value=restore_source == "Каталог бэкапов"
+        and entry is not None
+        and "archive_log" in entry.excluded_table_data,
+    )
+    if st.button("Восстановить"):
+        if restore_path is None:
+            st.warning("Выберите бэкап или загрузите файл.")
         else:
-            restore_path = Path(settings.backup_dir) / f"restore_{uploaded.name}"
-            restore_path.parent.mkdir(parents=True, exist_ok=True)
-            restore_path.write_bytes(uploaded.getbuffer())
             try:
-                backup_ops.restore_database(str(restore_path))
-                st.success("База данных восстановлена.")
-            except (subprocess.CalledProcessError, FileNotFoundError, SQLAlchemyError) as exc:
+                if restore_source == "Загрузить файл":
+                    uploaded.seek(0)
+                    restore_path, checksum, size = backup_ops.save_upload(
+                        uploaded, uploaded.name
+                    )
+                    st.caption(
+                        f"Файл сохранен: {size / 1024 / 1024:.1f} МБ, SHA-256 {checksum}"
+                    )
+                fmt = backup_ops.verify_backup(str(restore_path), expected_sha256)
+                st.caption(f"Проверка пройдена, формат: {fmt}.")
+                progress = st.progress(0.0, text="Восстановление...")
+                started = datetime.now()
+                for step in backup_ops.restore_backup_progress(
+                    str(restore_path), int(restore_jobs)
+                ):
+                    progress.progress(step.fraction, text=step.message[:120])
+                progress.progress(1.0, text="Готово")
+                clear_caches()
+                duration = (datetime.now() - started).total_seconds()
+                st.success(f"База данных восстановлена за {duration:.1f} с.")
+                if restore_segments:
+                    with SessionLocal() as session:
+                        restored = archive_export.import_archive_log(session)
+                    st.success(f"Загружено строк archive_log из сегментов: {restored}")
+            except subprocess.CalledProcessError as exc:
                 st.error(f"Ошибка восстановления: {exc}")
+                if exc.stderr:
+                    st.code(exc.stderr)
+            except (FileNotFoundError, ValueError, OSError, SQLAlchemyError) as exc:
+                st.error(f"Ошибка восстановления: {exc}")
+
+    if settings.partitioning != "none":
+        st.subheader("Партиции")
+        if st.button("Создать будущие партиции"):
+            try:
+                with SessionLocal() as session:
+                    created = services.ensure_partitions(session)
+                st.success(f"Создано партиций: {created}")
+            except SQLAlchemyError as exc:
+                st.error(f"Ошибка создания партиций: {exc}")
+        with SessionLocal() as session:
+            partitions = services.list_partitions(session)
+        if partitions:
+            st.dataframe(pd.DataFrame(partitions), width="stretch")
+
+    st.subheader("Пул соединений")
+    pool = pool_status(get_engine())
+    cols = st.columns(4)
+    sized = "size" in pool
+    cols[0].metric(
+        "Занято",
+        f"{pool['in_use']} / {pool['size'] + pool['max_overflow']}"
+        if sized
+        else pool["in_use"],
+    )
+    cols[1].metric("Пик занятости", pool["peak_in_use"])
+    cols[2].metric(
+        "Ожидание, мс (сред./макс.)",
+        f"{pool['wait_avg_ms']:.1f} / {pool['wait_max_ms']:.1f}",
+    )
+    cols[3].metric("Таймауты пула", pool["timeouts"])
+    if sized:
+        st.caption(
+            f"Размер пула: {pool['size']}, переполнение: {pool['overflow']} из "
+            f"{pool['max_overflow']}, свободно: {pool['idle']}, "
+            f"выдач: {pool['checkouts']}, новых соединений: {pool['connects']}, "
+            f"таймаут ожидания: {pool['timeout_s']} с."
+        )
+    else:
+        st.caption(
+            f"Пул {type(get_engine().pool).__name__} не сообщает размер; "
+            f"выдач: {pool['checkouts']}, новых соединений: {pool['connects']}."
+        )
+
+    st.subheader("Статистика запросов")
+    if not settings.db_statement_stats:
+        st.info("Сбор статистики отключен (DB_STATEMENT_STATS=false).")
+    else:
+        statement_stats = get_statement_stats()
+        summary = statement_stats.snapshot()
+        cols = st.columns(4)
+        cols[0].metric("Запросов", summary["calls"])
+        cols[1].metric("Время в БД, с", f"{summary['total_ms'] / 1000:.1f}")
+        cols[2].metric(f"Медленных (≥ {summary['slow_ms']} мс)", summary["slow"])
+        cols[3].metric("Ошибок", summary["errors"])
+        st.caption(
+            f"С {summary['since']:%d.%m.%Y %H:%M:%S}, уникальных запросов: "
+            f"{summary['fingerprints']}"
+            + (
+                f", не учтено сверх лимита: {summary['dropped']}"
+                if summary["dropped"]
+                else ""
+            )
+            + "."
+        )
+        order_labels = {
+            "total_ms": "Суммарное время",
+            "avg_ms": "Среднее время",
+            "max_ms": "Максимальное время",
+            "calls": "Число вызовов",
+            "rows": "Число строк",
+        }
+        order_by = st.selectbox(
+            "Сортировка",
+            list(order_labels),
+            format_func=order_labels.get,
+            key="statement_order",
+        )
+        top = statement_stats.top(20, order_by)
+        if top:
+            st.dataframe(
+                pd.DataFrame(top)
+                .round({"total_ms": 1, "avg_ms": 2, "max_ms": 1})
+                .rename(
+                    columns={
+                        "fingerprint": "Запрос",
+                        "calls": "Вызовов",
+                        "total_ms": "Всего, мс",
+                        "max_ms": "Макс., мс",
+                        "avg_ms": "Сред., мс",
+                        "rows": "Строк",
+                        "slow": "Медленных",
+                    }
+                ),
+                width="stretch",
+            )
+        if st.button("Сбросить статистику"):
+            statement_stats.reset()
+            st.success("Статистика запросов сброшена.")
+
+        slow_statements = statement_stats.slow_statements()
+        if slow_statements:
+            with st.expander(f"Медленные запросы ({len(slow_statements)})"):
+                slow_index = st.selectbox(
+                    "Запрос",
+                    range(len(slow_statements)),
+                    format_func=lambda index: (
+                        f"{slow_statements[index].executed_at:%H:%M:%S} · "
+                        f"{slow_statements[index].duration_ms:.0f} мс · "
+                        f"{slow_statements[index].fingerprint[:80]}"
+                    ),
+                    key="slow_statement",
+                )
+                slow = slow_statements[slow_index]
+                st.code(slow.statement, language="sql")
+                st.caption(
+                    "EXPLAIN ANALYZE выполняет запрос повторно в транзакции, "
+                    "которая затем откатывается."
+                )
+                if st.button(
+                    "EXPLAIN (ANALYZE, BUFFERS)", disabled=not slow.explainable
+                ):
+                    try:
+                        st.code(explain_analyze(get_engine(), slow))
+                    except SQLAlchemyError as exc:
+                        st.error(f"Ошибка EXPLAIN: {exc}")
+
+    st.subheader("Кэш отчетов")
+    cache_stats = get_report_cache().stats()
+    st.caption(
+        f"Записей: {cache_stats['entries']}, "
+        f"объем: {cache_stats['bytes'] / 1024 / 1024:.1f} МБ, "
+        f"попаданий: {cache_stats['hits']}, промахов: {cache_stats['misses']} "
+        f"({cache_stats['hit_ratio']:.0%}), вытеснено: {cache_stats['evictions']}"
+    )
+    if st.button("Очистить кэш"):
+        clear_caches()
+        st.success("Кэши очищены.")
+
+    st.subheader("Импорт операций")
+    import_kind = st.selectbox("Тип данных", ["Расходы", "Выплаты"], key="import_kind")
+    st.caption(
+        "Расходы: department (код или название), vendor (ИНН или название), amount, "
+        "expense_date, is_approved. Выплаты: employee (ФИО), period_start, period_end, "
+        "net_amount, paid_at, is_paid."
+    )
+    import_file = st.file_uploader(
+        "Файл CSV или XLSX", type=["csv", "xlsx"], key="import_file"
+    )
+    if st.button("Импортировать"):
+        if not import_file:
+            st.warning("Сначала загрузите файл.")
+        else:
+            importer = (
+                import_ops.import_expenses
+                if import_kind == "Расходы"
+                else import_ops.import_payrolls
+            )
+            try:
+                with SessionLocal() as session:
+                    result = importer(session, import_file, import_file.name)
+                st.success(
+                    f"Строк в файле: {result['total']}, загружено: {result['imported']}, "
+                    f"отклонено: {result['rejected']}"
+                )
+                if result["reject_file"]:
+                    st.download_button(
+                        "Скачать отклоненные строки",
+                        result["reject_file"].read_bytes(),
+                        file_name="otkloneno.csv.gz",
+                        mime="application/gzip",
+                    )
+            except ImportError:
+                st.error("Для импорта XLSX установите пакет openpyxl.")
+            except (ValueError, SQLAlchemyError) as exc:
+                st.error(f"Ошибка импорта: {exc}")
 
     st.subheader("Архивация выплат")
     cutoff_date = st.date_input("Архивировать выплаты до", value=date(2024, 2, 1))
-    if st.button("Запустить архивацию"):
+    batched = st.checkbox("Пакетный режим (короткие транзакции)", value=True)
+    batch_size = st.number_input(
+        "Размер пакета",
+        min_value=100,
+        step=1000,
+        value=services.ARCHIVE_BATCH_SIZE,
+        disabled=not batched,
+    )
+    col1, col2 = st.columns(2)
+    if col1.button("Оценить объем"):
         try:
             with SessionLocal() as session:
-                moved = services.run_archive(session, cutoff_date)
-            st.success(f"Архивировано выплат: {moved}")
+                preview = services.archive_preview(session, cutoff_date)
+            st.info(
+                f"К архивации: {preview['rows']} выплат, "
+                f"около {preview['estimated_bytes'] / 1024 / 1024:.1f} МБ "
+                f"(периоды {preview['oldest_period_end']} — "
+                f"{preview['newest_period_end']})."
+            )
         except SQLAlchemyError as exc:
-            st.error(f"Ошибка архивации: {exc}")
+            st.error(f"Ошибка оценки: {exc}")
+    if col2.button("Запустить архивацию"):
+        try:
+            with SessionLocal() as session:
+                if batched:
+                    total = services.archive_preview(session, cutoff_date)["rows"]
+                    progress = st.progress(0.0, text="Архивация...")
+                    moved = 0
+                    for moved in services.run_archive_batches(
+                        session, cutoff_date, int(batch_size)
+                    ):
+                        progress.progress(
+                            min(moved / total, 1.0) if total else 1.0,
+                            text=f"Перенесено {moved} из {total}",
+                        )
+                    progress.progress(1.0, text=f"Перенесено {moved} из {total}")
+                else:
+                    moved = services.run_archive(session, cutoff_date)
+                remaining = services.archive_remaining(session, cutoff_date)
+            if remaining:
+                st.warning(
+                    f"Архивировано выплат: {moved}. Часть строк заблокирована "
+                    "другой транзакцией и пропущена, повторите архивацию позже."
+                )
+            else:
+                st.success(f"Архивировано выплат: {moved}")
+        except SQLAlchemyError as exc:
+            st.error(
+                f"Ошибка архивации: {exc}. Уже перенесенные пакеты сохранены, "
+                "повторный запуск продолжит с места остановки."
+            )
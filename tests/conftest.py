@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from vsuet_accounting.infrastructure.db.session import SessionLocal
+
+
+@pytest.fixture
+def session():
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+    except OperationalError as exc:
+        session.close()
+        pytest.skip(f"PostgreSQL is not available: {exc.orig}")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
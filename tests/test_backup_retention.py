@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from vsuet_accounting.infrastructure.backup import CatalogEntry, select_retained
+
+START = datetime(2024, 1, 1, 2, 0)
+
+
+def entry(moment: datetime) -> CatalogEntry:
+    return CatalogEntry(
+        name=f"backup_{moment:%Y%m%d_%H%M%S}.dump",
+        format="custom",
+        created_at=moment,
+        size_bytes=1,
+        duration_seconds=0.1,
+        sha256="",
+    )
+
+
+def nightly(days: int) -> list[CatalogEntry]:
+    return [entry(START + timedelta(days=day)) for day in range(days)]
+
+
+def names(*moments: datetime) -> set[str]:
+    return {entry(moment).name for moment in moments}
+
+
+def test_empty_catalog_keeps_nothing() -> None:
+    assert select_retained([], 7, 4, 12) == set()
+
+
+def test_zero_counts_keep_only_the_newest_backup() -> None:
+    entries = nightly(10)
+
+    assert select_retained(entries, 0, 0, 0) == {entries[-1].name}
+
+
+def test_daily_keeps_the_newest_backup_of_each_recent_day() -> None:
+    entries = nightly(10) + [entry(START + timedelta(days=9, hours=12))]
+
+    kept = select_retained(entries, 3, 0, 0)
+
+    assert kept == names(
+        START + timedelta(days=9, hours=12),
+        START + timedelta(days=8),
+        START + timedelta(days=7),
+    )
+
+
+def test_weekly_keeps_the_newest_backup_of_each_iso_week() -> None:
+    kept = select_retained(nightly(21), 0, 2, 0)
+
+    assert kept == names(datetime(2024, 1, 21, 2, 0), datetime(2024, 1, 14, 2, 0))
+
+
+def test_monthly_keeps_the_newest_backup_of_each_month() -> None:
+    kept = select_retained(nightly(70), 0, 0, 3)
+
+    assert kept == names(
+        datetime(2024, 3, 10, 2, 0),
+        datetime(2024, 2, 29, 2, 0),
+        datetime(2024, 1, 31, 2, 0),
+    )
+
+
+def test_buckets_are_combined() -> None:
+    kept = select_retained(nightly(70), 2, 2, 2)
+
+    assert kept == names(
+        datetime(2024, 3, 10, 2, 0),
+        datetime(2024, 3, 9, 2, 0),
+        datetime(2024, 3, 3, 2, 0),
+        datetime(2024, 2, 29, 2, 0),
+    )
+
+
+def test_counts_larger_than_the_catalog_keep_everything() -> None:
+    entries = nightly(5)
+
+    assert select_retained(entries, 30, 10, 12) == {item.name for item in entries}
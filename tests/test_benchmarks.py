@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "benchmarks" / "run_services.py"
+
+
+@pytest.fixture(scope="module")
+def bench():
+    spec = importlib.util.spec_from_file_location("run_services", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        sys.modules.pop(spec.name, None)
+
+
+def metrics(p50: float, p95: float, rss: float = 0.0) -> dict[str, float]:
+    return {"p50_ms": p50, "p95_ms": p95, "rss_growth_mb": rss}
+
+
+def report(**cases) -> dict:
+    return {"sizes": {"10k": {"cases": cases}}}
+
+
+def test_same_timings_are_not_regressions(bench) -> None:
+    data = report(case=metrics(100, 120))
+
+    assert bench.compare(data, data, 0.25) == []
+
+
+def test_growth_within_threshold_is_allowed(bench) -> None:
+    current = report(case=metrics(124, 149))
+    baseline = report(case=metrics(100, 120))
+
+    assert bench.compare(current, baseline, 0.25) == []
+
+
+def test_growth_above_threshold_is_reported(bench) -> None:
+    current = report(case=metrics(126, 120))
+    baseline = report(case=metrics(100, 120))
+
+    regressions = bench.compare(current, baseline, 0.25)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("10k case: p50_ms 126.0 > 125.0")
+
+
+def test_fast_cases_need_the_absolute_minimum(bench) -> None:
+    baseline = report(case=metrics(2, 2))
+
+    assert bench.compare(report(case=metrics(6.9, 6.9)), baseline, 0.25) == []
+    assert len(bench.compare(report(case=metrics(7.1, 7.1)), baseline, 0.25)) == 2
+
+
+def test_rss_growth_is_reported(bench) -> None:
+    baseline = report(case=metrics(10, 10, rss=10))
+
+    assert bench.compare(report(case=metrics(10, 10, rss=26)), baseline, 0.25) == []
+    regressions = bench.compare(report(case=metrics(10, 10, rss=27)), baseline, 0.25)
+    assert regressions == ["10k case: RSS growth 27 MB (baseline 10 MB)"]
+
+
+def test_new_skipped_and_missing_cases_are_ignored(bench) -> None:
+    current = report(
+        new=metrics(1000, 1000),
+        skipped={"skipped": "more than 1000000 rows"},
+        was_skipped=metrics(1000, 1000),
+    )
+    baseline = report(was_skipped={"skipped": "more than 1000000 rows"})
+
+    assert bench.compare(current, baseline, 0.25) == []
+    assert bench.compare(current, {}, 0.25) == []
+
+
+def test_cases_cover_frame_option_and_archive_functions(bench) -> None:
+    names = {case.name for case in bench.service_cases(bench.DATASETS["10k"])}
+
+    for expected in (
+        "expenses_report_frame[all]",
+        "payrolls_report_frame[all]",
+        "expenses_summary_frame[all]",
+        "payrolls_summary_frame[all]",
+        "iter_payrolls_report[period]",
+        "list_departments",
+        "list_employees",
+        "list_vendors",
+        "department_options",
+        "employee_options",
+        "vendor_options",
+        "archive_preview[oldest year]",
+        "list_partitions",
+    ):
+        assert expected in names
+    assert len(names) == len(bench.service_cases(bench.DATASETS["10k"]))
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import date
+
+from vsuet_accounting.application.cache import ReportCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hit_returns_cached_value_without_recomputing() -> None:
+    cache = ReportCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [1, 2, 3]
+
+    first = cache.get_or_compute("report", ["expenses"], {"id": 1}, compute)
+    second = cache.get_or_compute("report", ["expenses"], {"id": 1}, compute)
+
+    assert first == second == (1, 2, 3)
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_list_results_are_stored_as_tuples() -> None:
+    cache = ReportCache()
+    value = cache.get_or_compute("report", ["expenses"], {}, lambda: [{"a": 1}])
+
+    assert isinstance(value, tuple)
+    assert cache.get_or_compute("report", ["expenses"], {}, list) is value
+
+
+def test_equivalent_filters_share_an_entry() -> None:
+    cache = ReportCache()
+    cache.get_or_compute(
+        "report", ["expenses"], {"date_from": date(2024, 1, 1), "amount": 5.0}, list
+    )
+    found, _ = cache.lookup(
+        cache.key("report", ["expenses"], {"amount": 5, "date_from": "2024-01-01"})
+    )
+
+    assert found
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache = ReportCache(ttl_seconds=10, clock=clock)
+    cache.get_or_compute("report", ["expenses"], {}, lambda: [1])
+
+    clock.now = 9.9
+    assert cache.lookup(cache.key("report", ["expenses"], {}))[0]
+    clock.now = 10.0
+    assert not cache.lookup(cache.key("report", ["expenses"], {}))[0]
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = ReportCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.get_or_compute(name, ["expenses"], {}, lambda: [name])
+    cache.lookup(cache.key("a", ["expenses"], {}))
+    cache.get_or_compute("c", ["expenses"], {}, lambda: ["c"])
+
+    assert cache.lookup(cache.key("a", ["expenses"], {}))[0]
+    assert not cache.lookup(cache.key("b", ["expenses"], {}))[0]
+    assert cache.lookup(cache.key("c", ["expenses"], {}))[0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_cap_evicts_and_skips_oversized_values() -> None:
+    cache = ReportCache(max_bytes=1000)
+    cache.put("small", b"x" * 400)
+    cache.put("medium", b"x" * 400)
+    cache.put("third", b"x" * 400)
+
+    assert not cache.lookup("small")[0]
+    assert cache.stats()["bytes"] <= 1000
+
+    cache.put("huge", b"x" * 2000)
+    assert not cache.lookup("huge")[0]
+    assert cache.lookup("third")[0]
+
+
+def test_bump_invalidates_only_dependent_reports() -> None:
+    cache = ReportCache()
+    cache.get_or_compute("expenses", ["expenses", "departments"], {}, lambda: [1])
+    cache.get_or_compute("payrolls", ["payrolls"], {}, lambda: [2])
+
+    cache.bump("departments")
+
+    assert not cache.lookup(cache.key("expenses", ["expenses", "departments"], {}))[0]
+    assert cache.lookup(cache.key("payrolls", ["payrolls"], {}))[0]
+
+
+def test_clear_drops_entries_and_keys() -> None:
+    cache = ReportCache()
+    key = cache.key("report", ["expenses"], {})
+    cache.put(key, (1,))
+
+    cache.clear()
+
+    assert cache.stats()["entries"] == 0
+    assert not cache.lookup(key)[0]
+    assert cache.key("report", ["expenses"], {}) != key
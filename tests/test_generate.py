@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from vsuet_accounting.infrastructure.db.generate import (
+    GeneratorParams,
+    copy_text,
+    employee_frame,
+    payroll_frame,
+)
+
+
+def test_copy_text_encodes_nulls_as_copy_null_marker() -> None:
+    frame = pd.DataFrame(
+        {
+            "id": [1, 2],
+            "paid_at": [datetime(2024, 1, 10, 10, 0), None],
+            "period_end": [date(2024, 1, 31), date(2024, 2, 29)],
+            "net_amount": [100.0, 200.5],
+            "is_paid": [True, False],
+        }
+    )
+
+    assert copy_text(frame) == (
+        "1\t2024-01-10 10:00:00\t2024-01-31\t100.00\tt\n"
+        "2\t\\N\t2024-02-29\t200.50\tf\n"
+    )
+
+
+def test_copy_text_escapes_text_values() -> None:
+    frame = pd.DataFrame({"name": ["a\tb", None, "c\\d"]})
+
+    assert copy_text(frame) == "a\\tb\n\\N\nc\\\\d\n"
+
+
+def test_unpaid_generated_payrolls_are_copied_as_null() -> None:
+    params = GeneratorParams(departments=3, employees=50, vendors=5, years=2)
+    rng = np.random.default_rng(params.seed)
+    payrolls = payroll_frame(params, employee_frame(params, rng), rng)
+    unpaid = ~payrolls["is_paid"]
+
+    lines = copy_text(payrolls[["id", "paid_at"]]).splitlines()
+    encoded = [line.split("\t")[1] for line in lines]
+
+    assert unpaid.any()
+    assert {encoded[index] for index in np.flatnonzero(unpaid)} == {"\\N"}
+    assert not any("Na" in value for value in encoded)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_BUDGETS_MS = {
+    "vsuet_accounting.infrastructure.db.bootstrap": 1500,
+    "vsuet_accounting.infrastructure.backup": 800,
+    "vsuet_accounting.application.services": 1500,
+}
+
+FORBIDDEN_MODULES = ("pandas", "numpy", "streamlit", "pyarrow")
+
+BUDGET_SCALE = float(os.environ.get("IMPORT_BUDGET_SCALE", "1"))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+forbidden = [name for name in {forbidden!r} if name in sys.modules]
+from vsuet_accounting.infrastructure.db import session
+print(json.dumps({{
+    "ms": elapsed,
+    "forbidden": forbidden,
+    "engine_created": session._engine is not None,
+}}))
+"""
+
+
+def measure(module: str, repeat: int = 3) -> dict:
+    samples = []
+    for _ in range(repeat):
+        probe = PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        ).stdout
+        samples.append(json.loads(output))
+    return min(samples, key=lambda sample: sample["ms"])
+
+
+@pytest.mark.parametrize("module, budget", IMPORT_BUDGETS_MS.items())
+def test_import_budget(module: str, budget: int) -> None:
+    result = measure(module)
+    assert result["forbidden"] == []
+    assert not result["engine_created"]
+    assert result["ms"] <= budget * BUDGET_SCALE
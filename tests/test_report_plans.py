@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from vsuet_accounting.application import services
+from vsuet_accounting.infrastructure.db import models
+
+CHECKED_TABLES = frozenset(
+    {"employees", "expenses", "payrolls", "payrolls_archive", "archive_log"}
+)
+
+PARTITION_SUFFIX = re.compile(r"_(p\d{4}(_\d{2})?|default)$")
+
+SAMPLE_FROM = date(2024, 1, 15)
+SAMPLE_TO = date(2024, 3, 10)
+
+
+def report_statements() -> dict[str, Any]:
+    return {
+        "expenses_report[department]": services._expenses_report_query(
+            department_id=1
+        ),
+        "expenses_report[vendor]": services._expenses_report_query(vendor_id=1),
+        "expenses_report[period]": services._expenses_report_query(
+            date_from=SAMPLE_FROM, date_to=SAMPLE_TO
+        ),
+        "expenses_report[department, period, approved]": (
+            services._expenses_report_query(
+                department_id=1,
+                date_from=SAMPLE_FROM,
+                date_to=SAMPLE_TO,
+                approved_only=True,
+            )
+        ),
+        "expenses_summary[period]": services._expenses_summary_query(
+            SAMPLE_FROM, SAMPLE_TO
+        ),
+        "payrolls_report[employee]": services._payrolls_report_statement(
+            employee_id=1
+        ),
+        "payrolls_report[period]": services._payrolls_report_statement(
+            date_from=SAMPLE_FROM, date_to=SAMPLE_TO
+        ),
+        "payrolls_report[employee, archived]": services._payrolls_report_statement(
+            employee_id=1, include_archived=True
+        ),
+        "payrolls_summary[period]": services._payrolls_summary_query(
+            SAMPLE_FROM, SAMPLE_TO
+        ),
+        "list_expenses_page": services._keyset_query(
+            select(models.Expense),
+            models.Expense.expense_date,
+            models.Expense.id,
+            services.encode_cursor(SAMPLE_FROM, 1),
+            services.PAGE_SIZE,
+        ),
+        "list_expenses_rows": services._keyset_query(
+            services._expenses_rows_query(),
+            models.Expense.expense_date,
+            models.Expense.id,
+            services.encode_cursor(SAMPLE_FROM, 1),
+            services.PAGE_SIZE,
+        ),
+        "list_payrolls_rows": services._keyset_query(
+            services._payrolls_rows_query(),
+            models.Payroll.period_end,
+            models.Payroll.id,
+            services.encode_cursor(SAMPLE_FROM, 1),
+            services.PAGE_SIZE,
+        ),
+        "list_payrolls_page": services._keyset_query(
+            select(models.Payroll),
+            models.Payroll.period_end,
+            models.Payroll.id,
+            services.encode_cursor(SAMPLE_FROM, 1),
+            services.PAGE_SIZE,
+        ),
+    }
+
+
+def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def explain(session: Session, statement) -> dict[str, Any]:
+    connection = session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    result = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    )
+    return result.scalar_one()[0]["Plan"]
+
+
+def seq_scans(session: Session, statement) -> list[str]:
+    scanned = {
+        PARTITION_SUFFIX.sub("", node["Relation Name"])
+        for node in _plan_nodes(explain(session, statement))
+        if node["Node Type"] == "Seq Scan"
+    }
+    return sorted(scanned & CHECKED_TABLES)
+
+
+@pytest.mark.parametrize("name", report_statements())
+def test_report_query_uses_indexes(session: Session, name: str) -> None:
+    session.execute(text("SET LOCAL enable_seqscan = off"))
+    assert seq_scans(session, report_statements()[name]) == []